@@ -0,0 +1,41 @@
+"""vacancy full text search
+
+Revision ID: 2f7a9c3e5d10
+Revises: 8c4f2d9e1b73
+Create Date: 2026-10-19 13:05:47.226190
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '2f7a9c3e5d10'
+down_revision: Union[str, None] = '8c4f2d9e1b73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('vacancies', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(
+            "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(content, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(content, '')), 'B')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+    op.create_index(
+        'ix_vacancies_search_vector', 'vacancies', ['search_vector'], unique=False, postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vacancies_search_vector', table_name='vacancies', postgresql_using='gin')
+    op.drop_column('vacancies', 'search_vector')
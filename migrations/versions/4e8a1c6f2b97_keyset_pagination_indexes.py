@@ -0,0 +1,40 @@
+"""keyset pagination indexes
+
+Revision ID: 4e8a1c6f2b97
+Revises: 9d3b6e0a4c58
+Create Date: 2026-10-19 15:02:41.318275
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e8a1c6f2b97'
+down_revision: Union[str, None] = '9d3b6e0a4c58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_vacancies_state_created_at_id', 'vacancies', ['state', 'created_at', 'id'], unique=False)
+    op.create_index('ix_vacancies_state_title_id', 'vacancies', ['state', 'title', 'id'], unique=False)
+    op.create_index(
+        'ix_vacancies_state_changed_at_id', 'vacancies',
+        ['state', sa.text('coalesce(updated_at, created_at)'), 'id'], unique=False
+    )
+    op.create_index('ix_attempts_user_id_created_at_id', 'attempts', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index(
+        'ix_attempts_user_id_test_id_created_at_id', 'attempts',
+        ['user_id', 'test_id', 'created_at', 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attempts_user_id_test_id_created_at_id', table_name='attempts')
+    op.drop_index('ix_attempts_user_id_created_at_id', table_name='attempts')
+    op.drop_index('ix_vacancies_state_changed_at_id', table_name='vacancies')
+    op.drop_index('ix_vacancies_state_title_id', table_name='vacancies')
+    op.drop_index('ix_vacancies_state_created_at_id', table_name='vacancies')
@@ -0,0 +1,26 @@
+"""attempts test_id index
+
+Revision ID: 5b1e0c7d2a41
+Revises: efc3aff388f9
+Create Date: 2026-10-19 10:12:31.402114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e0c7d2a41'
+down_revision: Union[str, None] = 'efc3aff388f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_attempts_test_id_percent', 'attempts', ['test_id', 'percent'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_attempts_test_id_percent', table_name='attempts')
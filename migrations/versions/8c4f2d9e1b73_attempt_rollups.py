@@ -0,0 +1,64 @@
+"""attempt rollups
+
+Revision ID: 8c4f2d9e1b73
+Revises: 5b1e0c7d2a41
+Create Date: 2026-10-19 11:40:05.918273
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c4f2d9e1b73'
+down_revision: Union[str, None] = '5b1e0c7d2a41'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('attempt_rollups',
+    sa.Column('bucket', sa.Enum('HOUR', 'DAY', name='rollupbucket'), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('testing_id', sa.UUID(), nullable=False),
+    sa.Column('vacancy_id', sa.UUID(), nullable=False),
+    sa.Column('attempts', sa.INTEGER(), nullable=False),
+    sa.Column('graded', sa.INTEGER(), nullable=False),
+    sa.Column('passed', sa.INTEGER(), nullable=False),
+    sa.Column('percent_sum', sa.BIGINT(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['testing_id'], ['testing.id'], ),
+    sa.ForeignKeyConstraint(['vacancy_id'], ['vacancies.id'], ),
+    sa.PrimaryKeyConstraint('bucket', 'bucket_start', 'testing_id')
+    )
+    op.create_index(op.f('ix_attempt_rollups_vacancy_id'), 'attempt_rollups', ['vacancy_id'], unique=False)
+
+    # Заполнение агрегатов по уже существующим попыткам
+    for bucket, trunc in (('HOUR', 'hour'), ('DAY', 'day')):
+        op.execute(f"""
+            INSERT INTO attempt_rollups (
+                bucket, bucket_start, testing_id, vacancy_id, attempts, graded, passed, percent_sum
+            )
+            SELECT
+                '{bucket}',
+                timezone('UTC', date_trunc('{trunc}', timezone('UTC', a.created_at))) AS bucket_start,
+                a.test_id,
+                t.vacancy_id,
+                count(*),
+                count(*) FILTER (WHERE t.type = 'THEORETICAL' OR a.updated_at IS NOT NULL),
+                count(*) FILTER (
+                    WHERE (t.type = 'THEORETICAL' OR a.updated_at IS NOT NULL) AND a.percent >= t.correct_percent
+                ),
+                coalesce(sum(a.percent) FILTER (WHERE t.type = 'THEORETICAL' OR a.updated_at IS NOT NULL), 0)
+            FROM attempts a
+            JOIN testing t ON a.test_id = t.id
+            GROUP BY bucket_start, a.test_id, t.vacancy_id
+        """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_attempt_rollups_vacancy_id'), table_name='attempt_rollups')
+    op.drop_table('attempt_rollups')
+    sa.Enum(name='rollupbucket').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,31 @@
+"""vacancy title trigram index
+
+Revision ID: 9d3b6e0a4c58
+Revises: 2f7a9c3e5d10
+Create Date: 2026-10-19 14:21:13.650448
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d3b6e0a4c58'
+down_revision: Union[str, None] = '2f7a9c3e5d10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.create_index(
+        'ix_vacancies_title_trgm', 'vacancies', ['title'], unique=False,
+        postgresql_using='gin',
+        postgresql_ops={'title': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vacancies_title_trgm', table_name='vacancies', postgresql_using='gin')
@@ -0,0 +1,52 @@
+"""vacancy summaries
+
+Revision ID: b7e2d5a91c34
+Revises: 4e8a1c6f2b97
+Create Date: 2026-10-19 16:10:52.407113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e2d5a91c34'
+down_revision: Union[str, None] = '4e8a1c6f2b97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('vacancy_summaries',
+    sa.Column('vacancy_id', sa.UUID(), nullable=False),
+    sa.Column('testing_count', sa.INTEGER(), nullable=False),
+    sa.Column('file_count', sa.INTEGER(), nullable=False),
+    sa.Column('poster_id', sa.UUID(), nullable=True),
+    sa.Column('poster_filename', sa.VARCHAR(length=255), nullable=True),
+    sa.Column('poster_content_type', sa.VARCHAR(length=255), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['vacancy_id'], ['vacancies.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('vacancy_id')
+    )
+
+    # Заполнение сводок по уже существующим вакансиям
+    op.execute("""
+        INSERT INTO vacancy_summaries (
+            vacancy_id, testing_count, file_count, poster_id, poster_filename, poster_content_type
+        )
+        SELECT
+            v.id,
+            (SELECT count(*) FROM testing t WHERE t.vacancy_id = v.id),
+            (SELECT count(*) FROM files f WHERE f.vacancy_id = v.id AND f.is_uploaded),
+            p.id,
+            p.filename,
+            p.content_type
+        FROM vacancies v
+        LEFT JOIN files p ON p.id = v.poster AND p.is_uploaded
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('vacancy_summaries')
@@ -0,0 +1,46 @@
+"""vacancy tombstones
+
+Revision ID: e1f4c8b26d53
+Revises: b7e2d5a91c34
+Create Date: 2026-10-19 17:05:18.622940
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1f4c8b26d53'
+down_revision: Union[str, None] = 'b7e2d5a91c34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('vacancy_tombstones',
+    sa.Column('vacancy_id', sa.UUID(), nullable=False),
+    sa.Column(
+        'state',
+        postgresql.ENUM('CLOSED', 'OPENED', name='vacancystate', create_type=False),
+        nullable=False
+    ),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('vacancy_id')
+    )
+    op.create_index(
+        'ix_vacancy_tombstones_deleted_at_vacancy_id', 'vacancy_tombstones',
+        ['deleted_at', 'vacancy_id'], unique=False
+    )
+    op.create_index(
+        'ix_vacancies_changed_at_id', 'vacancies',
+        [sa.text('coalesce(updated_at, created_at)'), 'id'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_vacancies_changed_at_id', table_name='vacancies')
+    op.drop_index('ix_vacancy_tombstones_deleted_at_vacancy_id', table_name='vacancy_tombstones')
+    op.drop_table('vacancy_tombstones')
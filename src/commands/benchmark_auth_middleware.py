@@ -0,0 +1,165 @@
+"""
+Сравнение пропускной способности middleware авторизации:
+прежняя реализация на BaseHTTPMiddleware (без кэша токенов) и ASGI middleware JWTMiddlewareHTTP
+
+Запросы выполняются прямыми ASGI-вызовами приложения, без сети и сервера.
+Обработчики /ping (публичный маршрут) и /vacancy/list не обращаются к БД
+(тело /vacancy/list - подготовленная страница из 40 вакансий), поэтому
+измеряется накладная стоимость middleware. /vacancy/list требует права
+GET_PUBLIC_VACANCY, поэтому запросы проходят авторизованный путь.
+
+Использование:
+    python -m src.commands.benchmark_auth_middleware [количество запросов]
+"""
+import asyncio
+import json
+import sys
+import time
+import uuid
+from types import SimpleNamespace
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response
+from starlette.authentication import AuthCredentials
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.middleware.jwt import JWTMiddlewareHTTP
+from src.models.auth import AuthenticatedUser, UnauthenticatedUser
+from src.models.permission import Permission
+from src.services.auth import JWTManager
+from src.utils.routing import public_route
+
+
+class BaseHTTPJWTMiddleware(BaseHTTPMiddleware):
+    """
+    Прежняя реализация JWTMiddlewareHTTP: на каждый запрос (включая публичные
+    маршруты) - новый JWTManager, проверка подписи и payload обоих токенов
+    и повторное декодирование access-токена
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        jwt = JWTManager(config=request.app.state.config)
+        reauth_session_dict = request.app.state.reauth_session_dict
+
+        # States
+        session_id = request.cookies.get("session_id")
+        current_tokens = jwt.get_jwt_cookie(request)
+        is_valid_session = False
+
+        # ----- pre_process -----
+        is_valid_access_token = jwt.is_valid_access_token(current_tokens.access_token)
+        is_valid_refresh_token = jwt.is_valid_refresh_token(current_tokens.refresh_token)
+
+        if session_id and current_tokens.refresh_token:
+            bad_ref_token = reauth_session_dict.get(session_id)
+            is_valid_session = (bad_ref_token != current_tokens.refresh_token)
+
+        is_auth = (is_valid_access_token and is_valid_refresh_token and is_valid_session)
+
+        # Установка данных авторизации
+        if is_auth:
+            payload = jwt.decode_access_token(current_tokens.access_token)
+            request.scope["user"] = AuthenticatedUser(**payload.model_dump())
+            request.scope["auth"] = AuthCredentials(["authenticated"])
+        else:
+            request.scope["user"] = UnauthenticatedUser()
+            request.scope["auth"] = AuthCredentials()
+
+        return await call_next(request)
+
+
+def create_app(middleware) -> FastAPI:
+    app = FastAPI()
+    app.state.config = SimpleNamespace(
+        JWT=SimpleNamespace(ACCESS_SECRET_KEY=uuid.uuid4().hex, REFRESH_SECRET_KEY=uuid.uuid4().hex)
+    )
+    app.state.reauth_session_dict = {}
+
+    page = json.dumps({
+        "content": [
+            {"id": str(uuid.uuid4()), "title": f"Вакансия {index}", "state": "opened", "type": "full"}
+            for index in range(40)
+        ]
+    }).encode("utf-8")
+
+    @app.get("/ping")
+    @public_route
+    async def ping():
+        return {"ping": "pong"}
+
+    @app.get("/vacancy/list")
+    async def vacancy_list(request: Request):
+        if not request.user.is_authenticated or not request.user.has_permission(Permission.GET_PUBLIC_VACANCY):
+            return Response(status_code=403)
+        return Response(content=page, media_type="application/json")
+
+    app.add_middleware(middleware)
+    return app
+
+
+def cookie_header(app: FastAPI) -> bytes:
+    jwt = JWTManager(config=app.state.config)
+    claims = {"id": str(uuid.uuid4()), "permissions": [Permission.GET_PUBLIC_VACANCY.value], "state_id": 1}
+    access_token = jwt._generate_token(3600, jwt.JWT_ACCESS_SECRET_KEY, **claims)
+    refresh_token = jwt._generate_token(3600, jwt.JWT_REFRESH_SECRET_KEY, **claims)
+    return f"access_token={access_token}; refresh_token={refresh_token}; session_id=benchmark".encode()
+
+
+async def run(app: FastAPI, path: str, requests: int) -> float:
+    headers = [(b"host", b"localhost"), (b"cookie", cookie_header(app))]
+
+    async def request():
+        done = asyncio.Event()
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await done.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start" and message["status"] != 200:
+                raise RuntimeError(f"{path}: {message['status']}")
+            if message["type"] == "http.response.body" and not message.get("more_body"):
+                done.set()
+
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": b"",
+            "headers": headers,
+            "client": ("127.0.0.1", 50000),
+            "server": ("localhost", 8000),
+            "app": app,
+        }
+        await app(scope, receive, send)
+
+    for _ in range(min(requests // 10, 500)):
+        await request()
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await request()
+    return requests / (time.perf_counter() - started)
+
+
+async def main(requests: int):
+    apps = {
+        "BaseHTTPMiddleware": create_app(BaseHTTPJWTMiddleware),
+        "ASGI": create_app(JWTMiddlewareHTTP),
+    }
+    for path in ("/ping", "/vacancy/list"):
+        results = {name: await run(app, path, requests) for name, app in apps.items()}
+        before, after = results["BaseHTTPMiddleware"], results["ASGI"]
+        print(f"{path:15} BaseHTTPMiddleware: {before:8.0f} rps  ASGI: {after:8.0f} rps  ({after / before:.2f}x)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000))
@@ -0,0 +1,50 @@
+"""
+Пересчёт агрегатов попыток (attempt_rollups) по истории
+
+Использование:
+    python -m src.commands.rebuild_attempt_rollups [--since YYYY-MM-DD]
+"""
+import argparse
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+
+from src.config import load_consul_config
+from src.db import create_psql_async_session
+from src.services.repository import AttemptRollupRepo
+
+
+async def main(since: datetime | None):
+    config = load_consul_config(
+        os.getenv('CONSUL_ROOT'),
+        host=os.getenv("CONSUL_HOST"),
+        port=int(os.getenv("CONSUL_PORT"))
+    )
+    engine, session_maker = create_psql_async_session(
+        host=config.DB.POSTGRESQL.HOST,
+        port=config.DB.POSTGRESQL.PORT,
+        username=config.DB.POSTGRESQL.USERNAME,
+        password=config.DB.POSTGRESQL.PASSWORD,
+        database=config.DB.POSTGRESQL.DATABASE,
+    )
+    try:
+        async with session_maker() as session:
+            await AttemptRollupRepo(session).rebuild(since=since)
+    finally:
+        await engine.dispose()
+
+    logging.info(f"Агрегаты попыток пересчитаны{f' начиная с {since:%Y-%m-%d}' if since else ''}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="Пересчёт агрегатов попыток")
+    parser.add_argument(
+        "--since",
+        type=lambda value: datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc),
+        default=None,
+        help="пересчитать начиная с указанного дня (по умолчанию - вся история)"
+    )
+    asyncio.run(main(parser.parse_args().since))
@@ -0,0 +1,40 @@
+"""
+Пересчёт сводок вакансий (vacancy_summaries) по исходным таблицам
+
+Использование:
+    python -m src.commands.rebuild_vacancy_summaries
+"""
+import asyncio
+import logging
+import os
+
+from src.config import load_consul_config
+from src.db import create_psql_async_session
+from src.services.repository import VacancySummaryRepo
+
+
+async def main():
+    config = load_consul_config(
+        os.getenv('CONSUL_ROOT'),
+        host=os.getenv("CONSUL_HOST"),
+        port=int(os.getenv("CONSUL_PORT"))
+    )
+    engine, session_maker = create_psql_async_session(
+        host=config.DB.POSTGRESQL.HOST,
+        port=config.DB.POSTGRESQL.PORT,
+        username=config.DB.POSTGRESQL.USERNAME,
+        password=config.DB.POSTGRESQL.PASSWORD,
+        database=config.DB.POSTGRESQL.DATABASE,
+    )
+    try:
+        async with session_maker() as session:
+            await VacancySummaryRepo(session).rebuild()
+    finally:
+        await engine.dispose()
+
+    logging.info("Сводки вакансий пересчитаны")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
@@ -43,6 +43,19 @@ class JWT:
     REFRESH_SECRET_KEY: str
 
 
+@dataclass
+class Search:
+    # postgres - полнотекстовый поиск Postgres, memory - внутрипроцессный обратный индекс
+    BACKEND: str = "postgres"
+
+
+@dataclass
+class Cache:
+    # memory - кэш в памяти воркера, shared - общий кэш воркеров хоста в /dev/shm
+    BACKEND: str = "memory"
+    SHARED_SIZE_MB: int = 32
+
+
 @dataclass
 class Base:
     TITLE: str
@@ -58,6 +71,8 @@ class Config:
     BASE: Base
     DB: DbConfig
     judge0host: str
+    SEARCH: Search
+    CACHE: Cache
 
 
 def to_bool(value) -> bool:
@@ -140,5 +155,12 @@ def load_consul_config(
                 PUBLIC_ENDPOINT_URL=config("DATABASE", "S3", "PUBLIC_ENDPOINT_URL")
             ),
         ),
-        judge0host=config("judge0host")
+        judge0host=config("judge0host"),
+        SEARCH=Search(
+            BACKEND=config("SEARCH", "BACKEND") or "postgres"
+        ),
+        CACHE=Cache(
+            BACKEND=config("CACHE", "BACKEND") or "memory",
+            SHARED_SIZE_MB=config("CACHE", "SHARED_SIZE_MB") or 32
+        )
     )
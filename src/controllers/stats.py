@@ -1,22 +1,25 @@
 from fastapi import APIRouter, Depends
 from fastapi import status as http_status
 
-from src.dependencies.services import get_services
-from src.services import ServiceFactory
+from src.dependencies.services import get_stats_service
+from src.services import StatsApplicationService
+from src.utils.routing import public_route
 
 router = APIRouter()
 
 
 @router.get("/version", response_model=dict, status_code=http_status.HTTP_200_OK)
-async def version(details: bool = False, services: ServiceFactory = Depends(get_services)):
+@public_route
+async def version(details: bool = False, stats: StatsApplicationService = Depends(get_stats_service)):
     """
     Получить информацию о приложении
 
     Ограничений по доступу нет
     """
-    return await services.stats.get_stats(details)
+    return await stats.get_stats(details)
 
 
 @router.get("/ping", response_model=str, status_code=http_status.HTTP_200_OK)
-def ping():
+@public_route
+async def ping():
     return "pong"
@@ -1,13 +1,16 @@
+from datetime import datetime
 from typing import Literal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, BackgroundTasks
+from fastapi import APIRouter, Depends, BackgroundTasks, Header
 from fastapi import status as http_status
 
 from src.dependencies.services import get_services
 from src.models import schemas
 from src.models.language import ProgramLanguage
+from src.models.rollup import RollupBucket
 from src.services import ServiceFactory
+from src.utils.etag import conditional_response
 from src.views.request import ApprovedRequestsResponse
 from src.views.testing import TestingsResponse, ProgramResultResponse
 from src.views.testing import PracticalQuestionsResponse
@@ -17,6 +20,8 @@ from src.views.testing import PracticalQuestionResponse
 from src.views.testing import TheoreticalQuestionResponse
 from src.views.testing import TestingResponse
 from src.views.testing import AttemptsTestResponse
+from src.views.testing import TestingScoreStatsResponse
+from src.views.testing import AttemptRollupsResponse
 
 router = APIRouter()
 
@@ -46,17 +51,26 @@ async def execute_program(
 
 
 @router.get("/list", response_model=TestingsResponse, status_code=http_status.HTTP_200_OK)
-async def get_testing_list(vacancy_id: UUID, services: ServiceFactory = Depends(get_services)):
+async def get_testing_list(
+        vacancy_id: UUID,
+        if_none_match: str = Header(None),
+        services: ServiceFactory = Depends(get_services)
+):
     """
     Получить список тестирований вакансии
 
+    Поддерживает условный запрос: при совпадении If-None-Match с ETag возвращается 304
+
     Требуемое состояние: Active
 
     Требуемые права доступа: GET_TESTING
     """
-    return TestingsResponse(
-        content=await services.testing.get_testings(vacancy_id)
+    etag, payload = await services.testing.get_testings_payload(
+        vacancy_id,
+        render=lambda testings: TestingsResponse(content=testings).model_dump_json().encode(),
+        if_none_match=if_none_match
     )
+    return conditional_response(etag, payload)
 
 
 @router.post("/new", response_model=TestingResponse, status_code=http_status.HTTP_201_CREATED)
@@ -80,6 +94,7 @@ async def get_self_attempts(
         page: int = 1,
         per_page: int = 10,
         order_by: Literal["title", "created_at"] = "created_at",
+        cursor: str = None,
         services: ServiceFactory = Depends(get_services)
 ):
     """
@@ -89,12 +104,48 @@ async def get_self_attempts(
 
     Требуемые права доступа: GET_SELF_TEST_RESULTS
 
+    Для перехода по страницам без OFFSET передайте next_cursor/prev_cursor ответа в cursor
     """
+    attempts = await services.testing.get_test_attempts(
+        page=page,
+        per_page=per_page,
+        order_by=order_by,
+        cursor=cursor
+    )
     return AttemptsTestResponse(
-        content=await services.testing.get_test_attempts(
-            page=page,
-            per_page=per_page,
-            order_by=order_by
+        content=attempts.items,
+        next_cursor=attempts.next_cursor,
+        prev_cursor=attempts.prev_cursor
+    )
+
+
+@router.get("/attempts/rollup", response_model=AttemptRollupsResponse, status_code=http_status.HTTP_200_OK)
+async def get_attempt_rollups(
+        bucket: RollupBucket = RollupBucket.DAY,
+        since: datetime = None,
+        until: datetime = None,
+        vacancy_id: UUID = None,
+        testing_id: UUID = None,
+        by_testing: bool = True,
+        services: ServiceFactory = Depends(get_services)
+):
+    """
+    Получить количество попыток, успешных попыток и средний процент по часам или дням
+
+    Требуемое состояние: ACTIVE
+
+    Требуемые права доступа: GET_USER_TEST_RESULTS
+
+    Максимальный период: 31 день для bucket=hour, 3 года для bucket=day
+    """
+    return AttemptRollupsResponse(
+        content=await services.testing.get_attempt_rollups(
+            bucket=bucket,
+            since=since,
+            until=until,
+            vacancy_id=vacancy_id,
+            testing_id=testing_id,
+            by_testing=by_testing
         )
     )
 
@@ -105,6 +156,7 @@ async def get_self_testing_attempts(
         page: int = 1,
         per_page: int = 10,
         order_by: Literal["title", "created_at"] = "created_at",
+        cursor: str = None,
         services: ServiceFactory = Depends(get_services)
 ):
     """
@@ -114,17 +166,36 @@ async def get_self_testing_attempts(
 
     Требуемые права доступа: GET_SELF_TEST_RESULTS
 
+    Для перехода по страницам без OFFSET передайте next_cursor/prev_cursor ответа в cursor
     """
+    attempts = await services.testing.get_test_attempts(
+        testing_id=testing_id,
+        page=page,
+        per_page=per_page,
+        order_by=order_by,
+        cursor=cursor
+    )
     return AttemptsTestResponse(
-        content=await services.testing.get_test_attempts(
-            testing_id=testing_id,
-            page=page,
-            per_page=per_page,
-            order_by=order_by
-        )
+        content=attempts.items,
+        next_cursor=attempts.next_cursor,
+        prev_cursor=attempts.prev_cursor
     )
 
 
+@router.get("/{testing_id}/stats", response_model=TestingScoreStatsResponse, status_code=http_status.HTTP_200_OK)
+async def get_testing_stats(testing_id: UUID, services: ServiceFactory = Depends(get_services)):
+    """
+    Получить распределение результатов тестирования по id:
+    гистограмму, перцентили, процент прошедших и количество попыток
+
+    Требуемое состояние: ACTIVE
+
+    Требуемые права доступа: GET_USER_TEST_RESULTS
+
+    """
+    return TestingScoreStatsResponse(content=await services.testing.get_testing_stats(testing_id))
+
+
 @router.get(
     "/approved/users",
     response_model=ApprovedRequestsResponse,
@@ -156,15 +227,26 @@ async def delete_testing(testing_id: UUID, services: ServiceFactory = Depends(ge
 
 
 @router.get("/{testing_id}", response_model=TestingResponse, status_code=http_status.HTTP_200_OK)
-async def get_testing(testing_id: UUID, services: ServiceFactory = Depends(get_services)):
+async def get_testing(
+        testing_id: UUID,
+        if_none_match: str = Header(None),
+        services: ServiceFactory = Depends(get_services)
+):
     """
     Получить тестирование по id
 
+    Поддерживает условный запрос: при совпадении If-None-Match с ETag возвращается 304
+
     Требуемое состояние: - Active
 
     Требуемые права доступа: GET_TESTING
     """
-    return TestingResponse(content=await services.testing.get_testing(testing_id))
+    etag, payload = await services.testing.get_testing_payload(
+        testing_id,
+        render=lambda testing: TestingResponse(content=testing).model_dump_json().encode(),
+        if_none_match=if_none_match
+    )
+    return conditional_response(etag, payload)
 
 
 @router.put("/{testing_id}", response_model=None, status_code=http_status.HTTP_204_NO_CONTENT)
@@ -471,6 +553,7 @@ async def create_theoretical_question_option(
 )
 async def get_theoretical_questions(
         testing_id: UUID,
+        if_none_match: str = Header(None),
         services: ServiceFactory = Depends(get_services)
 ):
     """
@@ -480,10 +563,14 @@ async def get_theoretical_questions(
 
     Требуемые права доступа: UPDATE_TESTING
 
+    Поддерживает условный запрос: при совпадении If-None-Match с ETag возвращается 304
     """
-    return TheoreticalQuestionsResponse(
-        content=await services.testing.get_theoretical_questions(testing_id)
+    etag, payload = await services.testing.get_theoretical_questions_payload(
+        testing_id,
+        render=lambda questions: TheoreticalQuestionsResponse(content=questions).model_dump_json().encode(),
+        if_none_match=if_none_match
     )
+    return conditional_response(etag, payload)
 
 
 @router.get(
@@ -493,6 +580,7 @@ async def get_theoretical_questions(
 )
 async def get_practical_questions(
         testing_id: UUID,
+        if_none_match: str = Header(None),
         services: ServiceFactory = Depends(get_services)
 ):
     """
@@ -502,7 +590,11 @@ async def get_practical_questions(
 
     Требуемые права доступа: UPDATE_TESTING
 
+    Поддерживает условный запрос: при совпадении If-None-Match с ETag возвращается 304
     """
-    return PracticalQuestionsResponse(
-        content=await services.testing.get_practical_questions(testing_id)
+    etag, payload = await services.testing.get_practical_questions_payload(
+        testing_id,
+        render=lambda questions: PracticalQuestionsResponse(content=questions).model_dump_json().encode(),
+        if_none_match=if_none_match
     )
+    return conditional_response(etag, payload)
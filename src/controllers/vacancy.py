@@ -1,15 +1,20 @@
 import uuid
+from datetime import datetime
 from typing import Literal
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Header, Query
 from fastapi import status as http_status
+from fastapi.responses import Response
 
 from src.dependencies.services import get_services
 from src.models import schemas
 from src.models.state import VacancyState
 from src.services import ServiceFactory
 from src.views import VacancyResponse, VacanciesResponse
+from src.views.vacancy import VacancyBatchResponse
 from src.views.vacancy import VacancyFilesResponse, VacancyFileUploadResponse, VacancyFileResponse
+from src.views.vacancy import VacancyTitleSuggestionResponse, VacancyChangesResponse, VacancyTitlesResponse
+from src.utils.etag import conditional_response
 
 router = APIRouter()
 
@@ -21,23 +26,119 @@ async def get_vacancy_list(
         per_page: int = 10,
         order_by: Literal["title", "updated_at", "created_at"] = "created_at",
         query: str = None,
+        search_mode: Literal["fulltext", "fuzzy"] = "fulltext",
+        cursor: str = None,
         services: ServiceFactory = Depends(get_services)
 ):
     """
     Получить список вакансий
 
+    Режимы поиска (search_mode):
+    * fulltext - полнотекстовый поиск по заголовку и содержанию
+    * fuzzy - поиск по заголовку с учетом опечаток и по подстроке
+
+    Для перехода по страницам без OFFSET передайте next_cursor/prev_cursor ответа в cursor
+    (недоступно при поиске)
+
+    Требуемое состояние: -
+
+    Требуемые права доступа: GET_PRIVATE_VACANCY / GET_PUBLIC_VACANCY
+    """
+    payload = await services.vacancy.get_vacancies_payload(
+        render=lambda vacancies: VacanciesResponse(
+            content=vacancies.items,
+            next_cursor=vacancies.next_cursor,
+            prev_cursor=vacancies.prev_cursor
+        ).model_dump_json().encode(),
+        state=state,
+        page=page,
+        per_page=per_page,
+        order_by=order_by,
+        query=query,
+        search_mode=search_mode,
+        cursor=cursor
+    )
+    return Response(content=payload, media_type="application/json")
+
+
+@router.get("/changes", response_model=VacancyChangesResponse, status_code=http_status.HTTP_200_OK)
+async def get_vacancy_changes(
+        since: datetime = None,
+        cursor: str = None,
+        limit: int = 100,
+        services: ServiceFactory = Depends(get_services)
+):
+    """
+    Получить вакансии, созданные, измененные или удаленные с момента синхронизации
+
+    Первый запрос - с since, следующие - с next_cursor предыдущего ответа
+    (пока has_more, а затем при следующей синхронизации)
+
+    Без права GET_PRIVATE_VACANCY - только открытые вакансии (закрытые
+    и удаленные открытые вакансии возвращаются как удаленные)
+
+    Требуемое состояние: -
+
+    Требуемые права доступа: GET_PRIVATE_VACANCY / GET_PUBLIC_VACANCY
+    """
+    return VacancyChangesResponse(
+        content=await services.vacancy.get_changes(since=since, cursor=cursor, limit=limit)
+    )
+
+
+@router.get("/suggest", response_model=VacancyTitlesResponse, status_code=http_status.HTTP_200_OK)
+async def get_title_completions(
+        state: VacancyState,
+        query: str,
+        limit: int = 10,
+        services: ServiceFactory = Depends(get_services)
+):
+    """
+    Получить подсказки заголовков вакансий по введенной части (автодополнение)
+
+    Ищет заголовки, начинающиеся с запроса или содержащие слово с таким началом
+
     Требуемое состояние: -
 
     Требуемые права доступа: GET_PRIVATE_VACANCY / GET_PUBLIC_VACANCY
     """
-    return VacanciesResponse(
-        content=await services.vacancy.get_vacancies(
-            state=state,
-            page=page,
-            per_page=per_page,
-            order_by=order_by,
-            query=query
-        )
+    return VacancyTitlesResponse(
+        content=await services.vacancy.get_title_completions(state=state, query=query, limit=limit)
+    )
+
+
+@router.get("/batch", response_model=VacancyBatchResponse, status_code=http_status.HTTP_200_OK)
+async def get_vacancy_batch(
+        ids: list[uuid.UUID] = Query(...),
+        services: ServiceFactory = Depends(get_services)
+):
+    """
+    Получить вакансии по списку id (?ids=...&ids=..., не более 100)
+
+    Вакансии возвращаются в порядке запроса; несуществующие и недоступные - в missing
+
+    Требуемое состояние: -
+
+    Требуемые права доступа: GET_PRIVATE_VACANCY / GET_PUBLIC_VACANCY
+    """
+    return VacancyBatchResponse(content=await services.vacancy.get_vacancies_by_ids(ids))
+
+
+@router.get("/correction", response_model=VacancyTitleSuggestionResponse, status_code=http_status.HTTP_200_OK)
+async def get_title_suggestion(
+        state: VacancyState,
+        query: str,
+        services: ServiceFactory = Depends(get_services)
+):
+    """
+    Получить наиболее похожий на запрос заголовок вакансии ("возможно, вы имели в виду")
+
+    Требуемое состояние: -
+
+    Требуемые права доступа: GET_PRIVATE_VACANCY / GET_PUBLIC_VACANCY
+    """
+    return VacancyTitleSuggestionResponse(
+        content=await services.vacancy.get_title_suggestion(state=state, query=query)
     )
 
 
@@ -56,15 +157,26 @@ async def new_vacancy(vacancy: schemas.VacancyCreate, services: ServiceFactory =
 
 
 @router.get("/{vacancy_id}", response_model=VacancyResponse, status_code=http_status.HTTP_200_OK)
-async def get_vacancy(vacancy_id: uuid.UUID, services: ServiceFactory = Depends(get_services)):
+async def get_vacancy(
+        vacancy_id: uuid.UUID,
+        if_none_match: str = Header(None),
+        services: ServiceFactory = Depends(get_services)
+):
     """
     Получить экзамен по id
 
+    Поддерживает условный запрос: при совпадении If-None-Match с ETag возвращается 304
+
     Требуемое состояние: -
 
     Требуемые права доступа: GET_PRIVATE_VACANCY / GET_PUBLIC_VACANCY
     """
-    return VacancyResponse(content=await services.vacancy.get_vacancy(vacancy_id))
+    etag, payload = await services.vacancy.get_vacancy_payload(
+        vacancy_id,
+        render=lambda vacancy: VacancyResponse(content=vacancy).model_dump_json().encode(),
+        if_none_match=if_none_match
+    )
+    return conditional_response(etag, payload)
 
 
 @router.put("/{vacancy_id}", response_model=None, status_code=http_status.HTTP_204_NO_CONTENT)
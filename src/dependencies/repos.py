@@ -10,4 +10,8 @@ async def get_repos(request: Request = None, websocket: WebSocket = None) -> Rep
     else:
         app = websocket.app
     async with app.state.db_session() as session:
-        yield RepoFactory(session)
+        yield RepoFactory(
+            session,
+            search_index=app.state.search_index,
+            autocomplete=app.state.autocomplete
+        )
@@ -2,7 +2,7 @@ from fastapi import Depends
 from fastapi.requests import Request
 
 from src.dependencies.repos import get_repos
-from src.services import ServiceFactory
+from src.services import ServiceFactory, StatsApplicationService
 from src.services.repository import RepoFactory
 
 
@@ -20,4 +20,12 @@ async def get_services(
         file_storage=global_scope.file_storage,
         http_client=global_scope.http_client,
         db_lazy_session=global_scope.db_session,
+        cache=global_scope.cache,
     )
+
+
+async def get_stats_service(request: Request) -> StatsApplicationService:
+    """
+    Сервис статистики без сессии БД и текущего пользователя (для публичных маршрутов)
+    """
+    return StatsApplicationService(config=request.app.state.config)
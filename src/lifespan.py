@@ -1,15 +1,21 @@
 import asyncio
 import logging
 import os
+import uuid
 from typing import Callable
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from fastapi import FastAPI
 from src.config import Config
 
 from src.db import create_psql_async_session
-from src.services.auth.scheduler import update_reauth_list
+from src.services.auth.scheduler import ReauthListSync
+from src.services.auth.shared_reauth import SharedReauthMap, HostLock
+from src.services.repository import VacancyRepo
+from src.services.search import InvertedIndex, TitleAutocomplete
 from src.utils.aiohttp_client import AiohttpClient
+from src.utils.cache import MemoryCache
+from src.utils.invalidation import InvalidationBus
+from src.utils.shared_cache import SharedMemoryCache
 from src.utils.s3 import S3Storage
 
 
@@ -25,6 +31,77 @@ async def init_db(app: FastAPI, config: Config):
     app.state.db_session = session
 
 
+async def init_search_index(app: FastAPI, config: Config):
+    index = InvertedIndex() if config.SEARCH.BACKEND == "memory" else None
+    autocomplete = TitleAutocomplete()
+
+    async with app.state.db_session() as session:
+        for document in await VacancyRepo(session).get_search_documents(with_content=index is not None):
+            autocomplete.add(document.id, document.title, document.state)
+            if index is not None:
+                index.add(document.id, document.title, document.content, document.state)
+
+    app.state.search_index = index
+    app.state.autocomplete = autocomplete
+    logging.info(f"Поисковые индексы построены: {len(autocomplete)} вакансий")
+
+
+async def refresh_search_index(app: FastAPI, vacancy_id: str):
+    """
+    Обновляет вакансию в поисковых индексах после ее изменения другим воркером
+
+    :param app:
+    :param vacancy_id: id вакансии из ключа кэша "vacancy_payload:<id>"
+    :return:
+    """
+    try:
+        vacancy_id = uuid.UUID(vacancy_id)
+    except ValueError:
+        return
+
+    index = app.state.search_index
+    async with app.state.db_session() as session:
+        documents = await VacancyRepo(session).get_search_documents(
+            with_content=index is not None,
+            ids=[vacancy_id]
+        )
+
+    if not documents:
+        app.state.autocomplete.remove(vacancy_id)
+        if index is not None:
+            index.remove(vacancy_id)
+        return
+
+    document = documents[0]
+    app.state.autocomplete.add(document.id, document.title, document.state)
+    if index is not None:
+        index.add(document.id, document.title, document.content, document.state)
+
+
+def init_cache(app: FastAPI, config: Config):
+    if config.CACHE.BACKEND == "shared":
+        app.state.cache = SharedMemoryCache(
+            size=config.CACHE.SHARED_SIZE_MB * 1024 * 1024,
+            version=config.BASE.VERSION
+        )
+    else:
+        app.state.cache = MemoryCache(maxsize=4096)
+
+
+async def init_invalidation_bus(app: FastAPI, config: Config):
+    bus = InvalidationBus(app.state.cache)
+    bus.on_invalidate("vacancy_payload:", lambda vacancy_id: refresh_search_index(app, vacancy_id))
+    bus.on_reset(lambda: init_search_index(app, config))
+    await bus.start(
+        host=config.DB.POSTGRESQL.HOST,
+        port=config.DB.POSTGRESQL.PORT,
+        user=config.DB.POSTGRESQL.USERNAME,
+        password=config.DB.POSTGRESQL.PASSWORD,
+        database=config.DB.POSTGRESQL.DATABASE,
+    )
+    app.state.invalidation_bus = bus
+
+
 # async def grpc_server(app_state):
 #     server = aio.server()
 #     blog_service_control_pb2_grpc.add_BlogServicer_to_server(BlogService(app_state), server)
@@ -36,17 +113,23 @@ async def init_db(app: FastAPI, config: Config):
 
 
 async def init_reauth_checker(app: FastAPI, config: Config):
-    scheduler = AsyncIOScheduler()
     ums_grps_host = os.getenv("UMS_GRPC_HOST")
     ums_grps_port = int(os.getenv("UMS_GRPC_PORT"))
-    scheduler.add_job(
-        update_reauth_list,
-        'interval',
-        seconds=5,
-        args=[app, config, (ums_grps_host, ums_grps_port)]
-    )
-    logging.getLogger('apscheduler.executors.default').setLevel(logging.WARNING)
-    scheduler.start()
+    reauth_sync = ReauthListSync(app, (ums_grps_host, ums_grps_port))
+    app.state.reauth_sync = reauth_sync
+    app.state.reauth_shared = None
+
+    # До первого ответа потока список пуст, поэтому он запрашивается целиком
+    # при запуске (не дольше ReauthListSync.TIMEOUT, при ошибке запуск продолжается)
+    await reauth_sync.update()
+
+    # host - синхронизацию выполняет один воркер хоста, остальные читают общую память
+    if os.getenv("REAUTH_SYNC_MODE", "worker") == "host":
+        app.state.reauth_shared = (SharedReauthMap(), HostLock())
+        run = reauth_sync.run_host_owned(*app.state.reauth_shared)
+    else:
+        run = reauth_sync.run()
+    app.state.reauth_sync_task = asyncio.get_running_loop().create_task(run)
 
 
 async def init_s3_storage(app: FastAPI, config: Config):
@@ -66,11 +149,14 @@ def create_start_app_handler(app: FastAPI, config: Config) -> Callable:
         logging.debug("Выполнение FastAPI startup event handler.")
         await init_db(app, config)
         await init_s3_storage(app, config)
+        await init_search_index(app, config)
 
         app.state.reauth_session_dict = dict()
         await init_reauth_checker(app, config)
 
         app.state.http_client = AiohttpClient()
+        init_cache(app, config)
+        await init_invalidation_bus(app, config)
         # asyncio.get_running_loop().create_task(grpc_server(app.state))
         logging.info("FastAPI Успешно запущен.")
 
@@ -81,5 +167,14 @@ def create_stop_app_handler(app: FastAPI) -> Callable:
     async def stop_app() -> None:
         logging.debug("Выполнение FastAPI shutdown event handler.")
         await app.state.http_client.close_session()
+        await app.state.invalidation_bus.stop()
+        app.state.reauth_sync_task.cancel()
+        await app.state.reauth_sync.close()
+        if app.state.reauth_shared is not None:
+            shared_map, lock = app.state.reauth_shared
+            shared_map.close()
+            lock.release()
+        if isinstance(app.state.cache, SharedMemoryCache):
+            app.state.cache.close()
 
     return stop_app
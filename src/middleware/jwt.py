@@ -1,30 +1,74 @@
-from starlette.authentication import AuthCredentials
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.middleware.exceptions import ExceptionMiddleware
+import time
 
-from fastapi.requests import Request
+from starlette.authentication import AuthCredentials
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Scope, Receive, Send
 
 from src.models.auth import AuthenticatedUser, UnauthenticatedUser
 from src.services.auth import JWTManager
-
-
-class JWTMiddlewareHTTP(BaseHTTPMiddleware):
-
-    def __init__(self, app: ExceptionMiddleware):
-        super().__init__(app)
-
-    async def dispatch(self, request: Request, call_next):
-        jwt = JWTManager(config=request.app.state.config)
-        reauth_session_dict = request.app.state.reauth_session_dict
+from src.utils.cache import MemoryCache
+from src.utils.routing import get_public_paths
+
+
+class JWTMiddlewareHTTP:
+    """
+    ASGI middleware авторизации по JWT из кук
+
+    Устанавливает scope["user"] и scope["auth"] и передает запрос дальше
+    без обертки ответа (в отличие от BaseHTTPMiddleware - без отдельной
+    задачи и потока в памяти на каждый запрос, потоковые ответы не буферизуются)
+
+    Каждый токен проверяется один раз: подпись и payload проверенных токенов
+    кэшируются до их exp, поэтому повторные запросы с теми же куками
+    не выполняют HMAC и валидацию pydantic. Пользователь (с маской прав)
+    также строится один раз на access-токен
+
+    Публичные маршруты (public_route) и документация пропускаются без
+    разбора кук: пользователь для них всегда неавторизованный
+    """
+
+    def __init__(self, app: ASGIApp, token_cache_size: int = 10000):
+        self.app = app
+        self._token_cache = MemoryCache(maxsize=token_cache_size)
+        self._users = MemoryCache(maxsize=token_cache_size)
+        self._jwt: JWTManager | None = None
+        self._public_paths: frozenset[str] | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket"):
+            if self.is_public(scope):
+                scope["user"] = UnauthenticatedUser()
+                scope["auth"] = AuthCredentials()
+            else:
+                self.authenticate(scope)
+        await self.app(scope, receive, send)
+
+    def is_public(self, scope: Scope) -> bool:
+        if self._public_paths is None:
+            # Маршруты известны только после запуска приложения
+            self._public_paths = get_public_paths(scope["app"])
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        return path in self._public_paths or (
+                bool(root_path) and path.startswith(root_path) and path[len(root_path):] in self._public_paths
+        )
+
+    def authenticate(self, scope: Scope) -> None:
+        connection = HTTPConnection(scope)
+        if self._jwt is None:
+            self._jwt = JWTManager(config=connection.app.state.config, token_cache=self._token_cache)
+        jwt = self._jwt
+        reauth_session_dict = connection.app.state.reauth_session_dict
 
         # States
-        session_id = request.cookies.get("session_id")
-        current_tokens = jwt.get_jwt_cookie(request)
+        session_id = connection.cookies.get("session_id")
+        current_tokens = jwt.get_jwt_cookie(connection)
         is_valid_session = False
 
         # ----- pre_process -----
-        is_valid_access_token = jwt.is_valid_access_token(current_tokens.access_token)
-        is_valid_refresh_token = jwt.is_valid_refresh_token(current_tokens.refresh_token)
+        access_payload = jwt.verify_access_token(current_tokens.access_token)
+        is_valid_access_token = access_payload is not None
+        is_valid_refresh_token = is_valid_access_token and jwt.is_valid_refresh_token(current_tokens.refresh_token)
 
         if session_id and current_tokens.refresh_token:
 
@@ -39,15 +83,17 @@ class JWTMiddlewareHTTP(BaseHTTPMiddleware):
 
         # Установка данных авторизации
         if is_auth:
-            payload = jwt.decode_access_token(current_tokens.access_token)
-            request.scope["user"] = AuthenticatedUser(**payload.model_dump())
-            request.scope["auth"] = AuthCredentials(["authenticated"])
+            user = self._users.get(current_tokens.access_token)
+            if user is None:
+                user = AuthenticatedUser(
+                    id=access_payload.id,
+                    permissions=access_payload.permissions,
+                    state_id=access_payload.state_id,
+                    exp=access_payload.exp
+                )
+                self._users.set(current_tokens.access_token, user, ttl=access_payload.exp - time.time())
+            scope["user"] = user
+            scope["auth"] = AuthCredentials(["authenticated"])
         else:
-            request.scope["user"] = UnauthenticatedUser()
-            request.scope["auth"] = AuthCredentials()
-
-        response = await call_next(request)
-
-        # ----- post_process -----
-
-        return response
+            scope["user"] = UnauthenticatedUser()
+            scope["auth"] = AuthCredentials()
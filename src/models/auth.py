@@ -3,7 +3,7 @@ from abc import ABC, abstractmethod
 
 from starlette import authentication
 
-from src.models.permission import Permission
+from src.models.permission import Permission, permission_mask
 from src.models.state import UserState
 
 
@@ -16,9 +16,17 @@ class BaseUser(ABC, authentication.BaseUser):
 
     @property
     @abstractmethod
-    def permissions(self) -> set[str]:
+    def permissions(self) -> frozenset[str]:
         pass
 
+    @property
+    @abstractmethod
+    def permission_mask(self) -> int:
+        pass
+
+    def has_permission(self, permission: Permission) -> bool:
+        return self.permission_mask & permission.mask != 0
+
     @property
     @abstractmethod
     def state(self) -> UserState | None:
@@ -38,9 +46,10 @@ class BaseUser(ABC, authentication.BaseUser):
 
 
 class AuthenticatedUser(BaseUser):
-    def __init__(self, id: str, permissions: list[Permission], state_id: int, exp: int, **kwargs):
+    def __init__(self, id: str, permissions: list[str], state_id: int, exp: int, **kwargs):
         self._id = uuid.UUID(id)
-        self._permissions = permissions
+        self._permissions = frozenset(permissions)
+        self._permission_mask = permission_mask(self._permissions)
         self._state_id = state_id
         self._exp = exp
 
@@ -57,8 +66,12 @@ class AuthenticatedUser(BaseUser):
         return self._id
 
     @property
-    def permissions(self) -> set[Permission]:
-        return set(self._permissions)
+    def permissions(self) -> frozenset[str]:
+        return self._permissions
+
+    @property
+    def permission_mask(self) -> int:
+        return self._permission_mask
 
     @property
     def state(self) -> UserState:
@@ -79,6 +92,11 @@ class AuthenticatedUser(BaseUser):
 
 
 class UnauthenticatedUser(BaseUser):
+    PERMISSIONS = frozenset({
+        Permission.GET_PUBLIC_VACANCY.value,
+    })
+    PERMISSION_MASK = permission_mask(PERMISSIONS)
+
     def __init__(self, exp: int = None, **kwargs):
         self._exp = exp
 
@@ -95,10 +113,12 @@ class UnauthenticatedUser(BaseUser):
         return None
 
     @property
-    def permissions(self) -> set[str]:
-        return {
-            Permission.GET_PUBLIC_VACANCY.value,
-        }
+    def permissions(self) -> frozenset[str]:
+        return self.PERMISSIONS
+
+    @property
+    def permission_mask(self) -> int:
+        return self.PERMISSION_MASK
 
     @property
     def state(self) -> None:
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Iterable
 
 
 class Permission(Enum):
@@ -20,3 +21,26 @@ class Permission(Enum):
     UPDATE_TESTING = "UPDATE_TESTING"
     DELETE_TESTING = "DELETE_TESTING"
     GET_USER_TEST_RESULTS = "GET_USER_TEST_RESULTS"
+
+    @property
+    def mask(self) -> int:
+        """
+        Бит права в маске прав пользователя
+        """
+        return _PERMISSION_MASKS[self.value]
+
+
+_PERMISSION_MASKS = {permission.value: 1 << index for index, permission in enumerate(Permission)}
+
+
+def permission_mask(values: Iterable[str]) -> int:
+    """
+    Маска прав по их значениям (неизвестные значения не учитываются)
+
+    :param values: значения Permission
+    :return:
+    """
+    mask = 0
+    for value in values:
+        mask |= _PERMISSION_MASKS.get(value, 0)
+    return mask
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class RollupBucket(str, Enum):
+    HOUR = "hour"
+    DAY = "day"
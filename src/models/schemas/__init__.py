@@ -4,8 +4,14 @@ from .jwt import TokenPayload
 from .error import Error
 from .error import FieldErrorItem
 
+from .page import Page
+
 from .vacancy import Vacancy
 from .vacancy import VacancySmall
+from .vacancy import VacancyListItem
+from .vacancy import VacancyChanges
+from .vacancy import VacancyTitle
+from .vacancy import VacancyBatch
 from .vacancy import VacancyCreate
 from .vacancy import VacancyUpdate
 from .vacancy import VacancyFile
@@ -14,11 +20,16 @@ from .vacancy import VacancyFileCreate
 from .vacancy import VacancyFileUpload
 
 from .testing import Testing
+from .testing import TestingSmall
 from .testing import TestingCreate
 from .testing import TestingUpdate
 
 from .attempt import Attempt
 from .attempt import AttemptTest
+from .attempt import AttemptTestSmall
+from .attempt import ScoreBucket
+from .attempt import TestingScoreStats
+from .attempt import AttemptRollup
 
 from .questions import TheoreticalQuestion
 from .questions import TheoreticalQuestionCreate
@@ -2,7 +2,7 @@ from datetime import datetime
 from uuid import UUID
 
 from pydantic import BaseModel
-from src.models.schemas import Testing
+from src.models.schemas import Testing, TestingSmall
 
 
 class Attempt(BaseModel):
@@ -23,3 +23,42 @@ class AttemptTest(Attempt):
 
     class Config:
         from_attributes = True
+
+
+class AttemptTestSmall(Attempt):
+    test: TestingSmall
+
+    class Config:
+        from_attributes = True
+
+
+class ScoreBucket(BaseModel):
+    start: int
+    end: int
+    count: int
+
+
+class TestingScoreStats(BaseModel):
+    testing_id: UUID
+    correct_percent: int
+
+    attempts: int
+    pending: int
+    users: int
+    passed: int
+    pass_rate: float
+
+    mean: float | None
+    percentiles: dict[str, float]
+    histogram: list[ScoreBucket]
+
+
+class AttemptRollup(BaseModel):
+    bucket_start: datetime
+    vacancy_id: UUID
+    testing_id: UUID | None
+
+    attempts: int
+    graded: int
+    passed: int
+    mean_percent: float | None
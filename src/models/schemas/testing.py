@@ -22,6 +22,21 @@ class Testing(BaseModel):
         from_attributes = True
 
 
+class TestingSmall(BaseModel):
+    id: UUID
+    title: str
+    type: TestType
+    correct_percent: int
+
+    vacancy_id: UUID
+
+    created_at: datetime
+    updated_at: datetime | None
+
+    class Config:
+        from_attributes = True
+
+
 class TestingCreate(BaseModel):
     title: str
     content: str
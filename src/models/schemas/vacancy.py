@@ -38,6 +38,30 @@ class VacancySmall(BaseModel):
         from_attributes = True
 
 
+class VacancyListItem(VacancySmall):
+    poster_url: str | None = None
+    poster_content_type: str | None = None
+    testing_count: int = 0
+    file_count: int = 0
+
+
+class VacancyBatch(BaseModel):
+    items: list[Vacancy]
+    missing: list[uuid.UUID]
+
+
+class VacancyTitle(BaseModel):
+    id: uuid.UUID
+    title: str
+
+
+class VacancyChanges(BaseModel):
+    changed: list[VacancySmall]
+    deleted: list[uuid.UUID]
+    next_cursor: str
+    has_more: bool
+
+
 class VacancyCreate(BaseModel):
     title: str
     content: str
@@ -1,9 +1,12 @@
 from src.db import Base
 
 from .vacancy import Vacancy
+from .vacancy_summary import VacancySummary
+from .vacancy_tombstone import VacancyTombstone
 from .testing import Testing
 from .file import File
 from .attempt import Attempt
+from .attempt_rollup import AttemptRollup
 
 from .theoretical_question import TheoreticalQuestion
 from .theoretical_question import AnswerOption
@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import Column, UUID, DateTime, func, ForeignKey, INTEGER
+from sqlalchemy import Column, UUID, DateTime, func, ForeignKey, INTEGER, Index
 from sqlalchemy.orm import relationship
 
 from src.db import Base
@@ -12,6 +12,12 @@ class Attempt(Base):
 
     """
     __tablename__ = "attempts"
+    __table_args__ = (
+        Index("ix_attempts_test_id_percent", "test_id", "percent"),
+        # Ключи курсорной пагинации попыток пользователя: (user_id, [test_id], created_at, id)
+        Index("ix_attempts_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_attempts_user_id_test_id_created_at_id", "user_id", "test_id", "created_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     percent = Column(INTEGER, nullable=False)
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, UUID, DateTime, func, ForeignKey, INTEGER, BIGINT, Enum
+
+from src.db import Base
+from src.models.rollup import RollupBucket
+
+
+class AttemptRollup(Base):
+    """
+    The AttemptRollup model
+
+    Агрегаты попыток по часам и дням для каждого тестирования
+    """
+    __tablename__ = "attempt_rollups"
+
+    bucket = Column(Enum(RollupBucket), primary_key=True)
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    testing_id = Column(UUID(as_uuid=True), ForeignKey("testing.id"), primary_key=True)
+    vacancy_id = Column(UUID(as_uuid=True), ForeignKey("vacancies.id"), nullable=False, index=True)
+
+    attempts = Column(INTEGER, nullable=False, default=0)
+    graded = Column(INTEGER, nullable=False, default=0)
+    passed = Column(INTEGER, nullable=False, default=0)
+    percent_sum = Column(BIGINT, nullable=False, default=0)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self.bucket} {self.bucket_start} {self.testing_id}>'
@@ -1,7 +1,8 @@
 import uuid
 
-from sqlalchemy import Column, UUID, VARCHAR, Enum, DateTime, func, INTEGER
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, UUID, VARCHAR, Enum, DateTime, func, INTEGER, Computed, Index, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 
 from src.db import Base
 
@@ -13,6 +14,20 @@ class Vacancy(Base):
     The Vacancy model
     """
     __tablename__ = "vacancies"
+    __table_args__ = (
+        Index("ix_vacancies_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_vacancies_title_trgm", "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"}
+        ),
+        # Ключи курсорной пагинации списка: (state, order_by, id)
+        Index("ix_vacancies_state_created_at_id", "state", "created_at", "id"),
+        Index("ix_vacancies_state_title_id", "state", "title", "id"),
+        Index("ix_vacancies_state_changed_at_id", "state", text("coalesce(updated_at, created_at)"), "id"),
+        # Ключ синхронизации изменений (vacancy/changes)
+        Index("ix_vacancies_changed_at_id", text("coalesce(updated_at, created_at)"), "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     title = Column(VARCHAR(255), nullable=False)
@@ -22,8 +37,28 @@ class Vacancy(Base):
     state = Column(Enum(VacancyState), default=VacancyState.CLOSED, nullable=False)
     test_time = Column(INTEGER(), nullable=False)
 
+    # Полнотекстовый индекс по заголовку (вес A) и содержанию (вес B)
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('russian', coalesce(content, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(content, '')), 'B')",
+            persisted=True
+        ),
+        nullable=True
+    ))
+
     files = relationship("models.tables.file.File", back_populates="vacancy")
     testing = relationship("models.tables.testing.Testing", back_populates="vacancy")
+    summary = relationship(
+        "models.tables.vacancy_summary.VacancySummary",
+        back_populates="vacancy",
+        uselist=False,
+        lazy="raise",
+        passive_deletes=True
+    )
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, UUID, DateTime, func, ForeignKey, INTEGER, VARCHAR
+from sqlalchemy.orm import relationship
+
+from src.db import Base
+
+
+class VacancySummary(Base):
+    """
+    The VacancySummary model
+
+    Денормализованные данные карточки вакансии: количество тестирований,
+    загруженных файлов и постер. Поддерживается сервисами вакансий и тестирований
+    """
+    __tablename__ = "vacancy_summaries"
+
+    vacancy_id = Column(UUID(as_uuid=True), ForeignKey("vacancies.id", ondelete="CASCADE"), primary_key=True)
+    vacancy = relationship("models.tables.vacancy.Vacancy", back_populates="summary")
+
+    testing_count = Column(INTEGER, nullable=False, default=0)
+    file_count = Column(INTEGER, nullable=False, default=0)
+
+    poster_id = Column(UUID(as_uuid=True), nullable=True)
+    poster_filename = Column(VARCHAR(255), nullable=True)
+    poster_content_type = Column(VARCHAR(255), nullable=True)
+
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self.vacancy_id}>'
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, UUID, DateTime, func, Enum, Index
+
+from src.db import Base
+from src.models.state import VacancyState
+
+
+class VacancyTombstone(Base):
+    """
+    The VacancyTombstone model
+
+    Отметка об удалении вакансии для синхронизации изменений (vacancy/changes)
+
+    Закрытие открытой вакансии также оставляет отметку (state=OPENED):
+    для пользователей без доступа к закрытым вакансиям она удалена
+    """
+    __tablename__ = "vacancy_tombstones"
+    __table_args__ = (
+        Index("ix_vacancy_tombstones_deleted_at_vacancy_id", "deleted_at", "vacancy_id"),
+    )
+
+    vacancy_id = Column(UUID(as_uuid=True), primary_key=True)
+    state = Column(Enum(VacancyState), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f'<{self.__class__.__name__}: {self.vacancy_id}>'
@@ -22,3 +22,21 @@ class ListOfDictReply(_message.Message):
     DICTS_FIELD_NUMBER: _ClassVar[int]
     dicts: _containers.RepeatedCompositeFieldContainer[Dictionary]
     def __init__(self, dicts: _Optional[_Iterable[_Union[Dictionary, _Mapping]]] = ...) -> None: ...
+
+class StreamReauthRequest(_message.Message):
+    __slots__ = ["since_version"]
+    SINCE_VERSION_FIELD_NUMBER: _ClassVar[int]
+    since_version: int
+    def __init__(self, since_version: _Optional[int] = ...) -> None: ...
+
+class ReauthChanges(_message.Message):
+    __slots__ = ["version", "snapshot", "added", "removed"]
+    VERSION_FIELD_NUMBER: _ClassVar[int]
+    SNAPSHOT_FIELD_NUMBER: _ClassVar[int]
+    ADDED_FIELD_NUMBER: _ClassVar[int]
+    REMOVED_FIELD_NUMBER: _ClassVar[int]
+    version: int
+    snapshot: bool
+    added: _containers.RepeatedCompositeFieldContainer[Dictionary]
+    removed: _containers.RepeatedScalarFieldContainer[str]
+    def __init__(self, version: _Optional[int] = ..., snapshot: bool = ..., added: _Optional[_Iterable[_Union[Dictionary, _Mapping]]] = ..., removed: _Optional[_Iterable[str]] = ...) -> None: ...
@@ -20,6 +20,11 @@ class UserManagementStub(object):
                 request_serializer=ums__control__pb2.GetListRequest.SerializeToString,
                 response_deserializer=ums__control__pb2.ListOfDictReply.FromString,
                 )
+        self.StreamReauthChanges = channel.unary_stream(
+                '/greet.UserManagement/StreamReauthChanges',
+                request_serializer=ums__control__pb2.StreamReauthRequest.SerializeToString,
+                response_deserializer=ums__control__pb2.ReauthChanges.FromString,
+                )
 
 
 class UserManagementServicer(object):
@@ -33,6 +38,13 @@ class UserManagementServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def StreamReauthChanges(self, request, context):
+        """Server streaming: изменения списка сессий для повторной авторизации
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_UserManagementServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -41,6 +53,11 @@ def add_UserManagementServicer_to_server(servicer, server):
                     request_deserializer=ums__control__pb2.GetListRequest.FromString,
                     response_serializer=ums__control__pb2.ListOfDictReply.SerializeToString,
             ),
+            'StreamReauthChanges': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamReauthChanges,
+                    request_deserializer=ums__control__pb2.StreamReauthRequest.FromString,
+                    response_serializer=ums__control__pb2.ReauthChanges.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'greet.UserManagement', rpc_method_handlers)
@@ -68,3 +85,20 @@ class UserManagement(object):
             ums__control__pb2.ListOfDictReply.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def StreamReauthChanges(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/greet.UserManagement/StreamReauthChanges',
+            ums__control__pb2.StreamReauthRequest.SerializeToString,
+            ums__control__pb2.ReauthChanges.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
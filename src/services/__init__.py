@@ -17,6 +17,7 @@ class ServiceFactory:
             file_storage,
             http_client,
             db_lazy_session,
+            cache,
     ):
         self._repo = repo_factory
         self._current_user = current_user
@@ -24,14 +25,18 @@ class ServiceFactory:
         self._file_storage = file_storage
         self._http_client = http_client
         self._db_lazy_session = db_lazy_session
+        self._cache = cache
 
     @property
     def vacancy(self) -> VacancyApplicationService:
         return VacancyApplicationService(
             self._current_user,
             vacancy_repo=self._repo.vacancy,
+            vacancy_summary_repo=self._repo.vacancy_summary,
             file_repo=self._repo.file,
             file_storage=self._file_storage,
+            cache=self._cache,
+            db_lazy_session=self._db_lazy_session,
         )
 
     @property
@@ -40,13 +45,16 @@ class ServiceFactory:
             self._current_user,
             testing_repo=self._repo.testing,
             attempt_repo=self._repo.attempt,
+            attempt_rollup_repo=self._repo.attempt_rollup,
             vacancy_repo=self._repo.vacancy,
+            vacancy_summary_repo=self._repo.vacancy_summary,
             practical_question_repo=self._repo.practical_question,
             theoretical_question_repo=self._repo.theoretical_question,
             answer_option_repo=self._repo.answer_option,
             http_client=self._http_client,
             config=self._config,
             db_lazy_session=self._db_lazy_session,
+            cache=self._cache,
         )
 
     @property
@@ -1,7 +1,7 @@
 from functools import wraps
 
 from src.exceptions import AccessDenied
-from src.models.permission import Permission
+from src.models.permission import Permission, permission_mask
 from src.models.state import UserState
 
 
@@ -14,6 +14,8 @@ def permission_filter(*tags: Permission):
     :return: decorator
     """
 
+    mask = permission_mask(tag.value for tag in tags)
+
     def decorator(func):
         @wraps(func)
         async def wrapper(*args, **kwargs):
@@ -23,7 +25,7 @@ def permission_filter(*tags: Permission):
             if not current_user:
                 raise ValueError('AuthMiddleware not found')
 
-            if {tag.value for tag in tags}.issubset(current_user.permissions):
+            if current_user.permission_mask & mask == mask:
                 return await func(*args, **kwargs)
 
             raise AccessDenied('У Вас нет прав для выполнения этого действия')
@@ -34,8 +36,7 @@ def permission_filter(*tags: Permission):
 
 
 def state_filter(*states: UserState):
-    if not states:
-        states = [state for state in UserState]
+    states = frozenset(states or UserState)
 
     def decorator(func):
         @wraps(func)
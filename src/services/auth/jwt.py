@@ -1,11 +1,12 @@
 import time
 
 import jwt
-from fastapi import Request
+from starlette.requests import HTTPConnection
 from pydantic import ValidationError
 
 from src.config import Config
 from src.models import schemas
+from src.utils.cache import MemoryCache
 
 
 class JWTManager:
@@ -16,22 +17,40 @@ class JWTManager:
     COOKIE_ACCESS_KEY = "access_token"
     COOKIE_REFRESH_KEY = "refresh_token"
 
-    def __init__(self, config: Config):
+    def __init__(self, config: Config, token_cache: MemoryCache = None):
+        """
+        :param config:
+        :param token_cache: кэш проверенных токенов (токен -> payload), записи живут до exp токена
+        """
         self._config = config
+        self._token_cache = token_cache
 
         self.JWT_ACCESS_SECRET_KEY = config.JWT.ACCESS_SECRET_KEY
         self.JWT_REFRESH_SECRET_KEY = config.JWT.REFRESH_SECRET_KEY
 
+    def verify_access_token(self, token: str | None) -> schemas.TokenPayload | None:
+        """
+        Проверяет access-токен и получает его payload за одно декодирование
+        :param token:
+        :return: payload или None, если токен невалиден
+        """
+        return self._verify_jwt(token, self.JWT_ACCESS_SECRET_KEY, "access")
+
+    def verify_refresh_token(self, token: str | None) -> schemas.TokenPayload | None:
+        """
+        Проверяет refresh-токен и получает его payload за одно декодирование
+        :param token:
+        :return: payload или None, если токен невалиден
+        """
+        return self._verify_jwt(token, self.JWT_REFRESH_SECRET_KEY, "refresh")
+
     def is_valid_refresh_token(self, token: str | None) -> bool:
         """
         Проверяет refresh-токен на валидность
         :param token:
         :return:
         """
-        if not token:
-            return False
-
-        return self._is_valid_jwt(token, self.JWT_REFRESH_SECRET_KEY)
+        return self.verify_refresh_token(token) is not None
 
     def is_valid_access_token(self, token: str | None) -> bool:
         """
@@ -39,10 +58,7 @@ class JWTManager:
         :param token:
         :return:
         """
-        if not token:
-            return False
-
-        return self._is_valid_jwt(token, self.JWT_ACCESS_SECRET_KEY)
+        return self.verify_access_token(token) is not None
 
     def decode_access_token(self, token: str) -> schemas.TokenPayload:
         """
@@ -60,7 +76,7 @@ class JWTManager:
         """
         return self._decode_jwt(token, self.JWT_REFRESH_SECRET_KEY)
 
-    def get_jwt_cookie(self, req_obj: Request) -> schemas.Tokens:
+    def get_jwt_cookie(self, req_obj: HTTPConnection) -> schemas.Tokens:
         """
         Получает из кук access и refresh-токены
         :param req_obj:
@@ -70,18 +86,38 @@ class JWTManager:
         refresh_token = req_obj.cookies.get(self.COOKIE_REFRESH_KEY)
         return schemas.Tokens(access_token=access_token, refresh_token=refresh_token)
 
-    def _is_valid_jwt(self, token: str, secret_key: str) -> bool:
+    def _verify_jwt(self, token: str | None, secret_key: str, kind: str) -> schemas.TokenPayload | None:
+        """
+        param: token: токен
+        param: secret_key: секретный ключ
+        param: kind: тип токена (ключ кэша)
+        :return: payload или None
+        """
+        if not token:
+            return None
+
+        key = f"{kind}:{token}"
+        if self._token_cache is not None:
+            payload = self._token_cache.get(key)
+            if payload is not None:
+                return payload
+
         try:
-            data = jwt.decode(token, secret_key, algorithms=self.ALGORITHM)
-            schemas.TokenPayload.model_validate(data)
+            payload = schemas.TokenPayload.model_validate(
+                jwt.decode(token, secret_key, algorithms=self.ALGORITHM)
+            )
         except (
                 jwt.exceptions.InvalidTokenError,
                 jwt.exceptions.ExpiredSignatureError,
                 jwt.exceptions.DecodeError,
                 ValidationError
         ):
-            return False
-        return True
+            return None
+
+        if self._token_cache is not None:
+            # Запись истекает вместе с токеном, после чего токен снова не пройдет проверку
+            self._token_cache.set(key, payload, ttl=payload.exp - time.time())
+        return payload
 
     def _generate_token(self, exp: int, secret_key: str, **kwargs) -> str:
         """
@@ -1,20 +1,169 @@
+import asyncio
+import json
 import logging
+import os
 
 import grpc
 from src.protos.ums_control import ums_control_pb2
 from src.protos.ums_control import ums_control_pb2_grpc
+from src.services.auth.shared_reauth import SharedReauthMap, HostLock
 
 
-async def update_reauth_list(app, config, ums_grps_addr: tuple[str, int]):
-    app.state.reauth_session_dict = dict()
+class ReauthListSync:
+    """
+    Синхронизация списка сессий, требующих повторной авторизации, с UMS
 
-    try:
+    Использует один долгоживущий канал gRPC (keepalive, повтор запросов
+    при UNAVAILABLE). Список запрашивается целиком при запуске
+    (lifespan), затем изменения приходят потоком StreamReauthChanges
+    (версионированные дельты), при разрыве поток возобновляется с последней
+    примененной версии. Если UMS не поддерживает поток, список
+    запрашивается целиком каждые POLL_INTERVAL секунд.
 
-        async with grpc.aio.insecure_channel(f"{ums_grps_addr[0]}:{ums_grps_addr[1]}") as channel:
-            stub = ums_control_pb2_grpc.UserManagementStub(channel)
-            response = await stub.GetListOfReauth(ums_control_pb2.GetListRequest())
+    Полный список заменяет app.state.reauth_session_dict целиком и только
+    после успешного ответа: при ошибке остается прежний список.
 
-        app.state.reauth_session_dict = {d.key: d.value for d in response.dicts}
+    В режиме одного владельца на хост (run_host_owned) синхронизацию
+    выполняет только процесс, получивший HostLock, и публикует список
+    в SharedReauthMap, из которой читают остальные воркеры.
+    """
 
-    except grpc.RpcError as e:
-        logging.error(f"Error: {e}")
+    TIMEOUT = 3
+    POLL_INTERVAL = 5
+    MAX_RECONNECT_DELAY = 30
+    OWNER_CHECK_INTERVAL = 5
+    PUBLISH_DELAY = 0.05
+
+    SERVICE_CONFIG = {
+        "methodConfig": [{
+            "name": [{"service": "greet.UserManagement"}],
+            "retryPolicy": {
+                "maxAttempts": 3,
+                "initialBackoff": "0.1s",
+                "maxBackoff": "1s",
+                "backoffMultiplier": 2,
+                "retryableStatusCodes": ["UNAVAILABLE"],
+            },
+        }]
+    }
+
+    def __init__(self, app, ums_grps_addr: tuple[str, int]):
+        self._app = app
+        self._channel = grpc.aio.insecure_channel(
+            f"{ums_grps_addr[0]}:{ums_grps_addr[1]}",
+            options=[
+                ("grpc.keepalive_time_ms", 30000),
+                ("grpc.keepalive_timeout_ms", 10000),
+                ("grpc.keepalive_permit_without_calls", 1),
+                ("grpc.http2.max_pings_without_data", 0),
+                ("grpc.enable_retries", 1),
+                ("grpc.service_config", json.dumps(self.SERVICE_CONFIG)),
+            ]
+        )
+        self._stub = ums_control_pb2_grpc.UserManagementStub(self._channel)
+        self._version = 0
+        self._shared_map: SharedReauthMap | None = None
+        self._publish_pending = False
+
+    async def run_host_owned(self, shared_map: SharedReauthMap, lock: HostLock) -> None:
+        """
+        Читает список из общей памяти и выполняет синхронизацию,
+        когда процесс становится владельцем блокировки хоста
+
+        :param shared_map: общий список воркеров хоста
+        :param lock: блокировка владельца синхронизации
+        :return:
+        """
+        while not lock.try_acquire():
+            # До первой публикации владельцем используется список, полученный при запуске
+            if self._app.state.reauth_session_dict is not shared_map and shared_map.is_published():
+                self._app.state.reauth_session_dict = shared_map
+            await asyncio.sleep(self.OWNER_CHECK_INTERVAL)
+
+        logging.info(f"Процесс {os.getpid()} выполняет синхронизацию списка повторной авторизации")
+        if self._app.state.reauth_session_dict is shared_map:
+            # Снимок прежнего владельца остается в силе, пока список не получен
+            await self.update()
+        self._shared_map = shared_map
+        if self._app.state.reauth_session_dict is not shared_map:
+            self._publish()
+        await self.run()
+
+    async def run(self) -> None:
+        """
+        Получает изменения списка до отмены задачи
+
+        :return:
+        """
+        delay = 1
+        while True:
+            try:
+                changes_stream = self._stub.StreamReauthChanges(
+                    ums_control_pb2.StreamReauthRequest(since_version=self._version),
+                    wait_for_ready=True
+                )
+                async for changes in changes_stream:
+                    self.apply(changes)
+                    delay = 1
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                    logging.warning("UMS не поддерживает StreamReauthChanges, используется опрос")
+                    await self.poll()
+                    return
+                logging.error(f"Error: {e}")
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.MAX_RECONNECT_DELAY)
+
+    async def poll(self) -> None:
+        while True:
+            await self.update()
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    def apply(self, changes: ums_control_pb2.ReauthChanges) -> None:
+        """
+        Применяет изменения списка
+
+        :param changes: полный список (snapshot) или дельта после текущей версии
+        :return:
+        """
+        if changes.snapshot:
+            self._app.state.reauth_session_dict = {d.key: d.value for d in changes.added}
+        elif changes.version > self._version:
+            reauth_session_dict = self._app.state.reauth_session_dict
+            for session_id in changes.removed:
+                reauth_session_dict.pop(session_id, None)
+            for d in changes.added:
+                reauth_session_dict[d.key] = d.value
+        else:
+            return  # уже применено до переподключения
+        self._version = changes.version
+        self._changed()
+
+    async def update(self) -> None:
+        try:
+            response = await self._stub.GetListOfReauth(ums_control_pb2.GetListRequest(), timeout=self.TIMEOUT)
+        except grpc.RpcError as e:
+            logging.error(f"Error: {e}")
+            return
+
+        self._app.state.reauth_session_dict = {d.key: d.value for d in response.dicts}
+        self._version = 0
+        self._changed()
+
+    def _changed(self) -> None:
+        # Серия дельт публикуется одним снимком
+        if self._shared_map is None or self._publish_pending:
+            return
+        self._publish_pending = True
+        asyncio.get_running_loop().call_later(self.PUBLISH_DELAY, self._publish)
+
+    def _publish(self) -> None:
+        self._publish_pending = False
+        try:
+            self._shared_map.publish(self._app.state.reauth_session_dict)
+        except OSError as e:
+            logging.error(f"Не удалось опубликовать список повторной авторизации: {e}")
+
+    async def close(self) -> None:
+        await self._channel.close()
@@ -0,0 +1,169 @@
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import time
+
+
+class SharedReauthMap:
+    """
+    Список сессий для повторной авторизации, общий для воркеров хоста
+
+    Владелец синхронизации публикует полный список неизменяемым снимком:
+    хэш-таблица (открытая адресация) и данные пишутся во временный файл
+    в /dev/shm, который атомарно заменяет предыдущий, а в старом снимке
+    выставляется признак устаревания. Остальные воркеры читают снимок через
+    mmap без блокировок и десериализации и переоткрывают файл, только когда
+    их снимок устарел.
+
+    Поддерживает get(session_id), как словарь app.state.reauth_session_dict.
+    """
+
+    # Заголовок: признак устаревания, емкость таблицы, количество записей
+    HEADER = struct.Struct("<B7xII")
+    # Ячейка: хэш session_id (0 - пусто), смещение данных, длина ключа, длина значения
+    SLOT = struct.Struct("<QIHH")
+
+    REOPEN_INTERVAL = 1
+
+    def __init__(self, path: str = "/dev/shm/vacancy-service-reauth"):
+        self._path = path
+        self._mm: mmap.mmap | None = None
+        self._capacity = 0
+        self._opened_at = 0.0
+        self._published_fd: int | None = None
+
+    def get(self, session_id: str, default: str | None = None) -> str | None:
+        mm = self._snapshot()
+        if mm is None or not self._capacity:
+            return default
+
+        key = session_id.encode("utf-8")
+        key_hash = self._hash(key)
+        mask = self._capacity - 1
+        index = key_hash & mask
+        for _ in range(self._capacity):
+            slot_hash, offset, key_length, value_length = self.SLOT.unpack_from(
+                mm, self.HEADER.size + index * self.SLOT.size
+            )
+            if slot_hash == 0:
+                return default
+            if slot_hash == key_hash and mm[offset:offset + key_length] == key:
+                return mm[offset + key_length:offset + key_length + value_length].decode("utf-8")
+            index = (index + 1) & mask
+        return default
+
+    def is_published(self) -> bool:
+        """
+        Опубликован ли список владельцем синхронизации
+
+        :return:
+        """
+        return self._snapshot() is not None
+
+    def publish(self, sessions: dict[str, str]) -> None:
+        """
+        Публикует полный список (вызывается владельцем синхронизации)
+
+        :param sessions: session_id -> refresh-токен
+        :return:
+        """
+        capacity = 16
+        while capacity < len(sessions) * 2:
+            capacity *= 2
+
+        table = bytearray(capacity * self.SLOT.size)
+        data = bytearray()
+        data_offset = self.HEADER.size + len(table)
+        mask = capacity - 1
+        for session_id, token in sessions.items():
+            key, value = session_id.encode("utf-8"), token.encode("utf-8")
+            key_hash = self._hash(key)
+            index = key_hash & mask
+            while self.SLOT.unpack_from(table, index * self.SLOT.size)[0] != 0:
+                index = (index + 1) & mask
+            self.SLOT.pack_into(table, index * self.SLOT.size, key_hash, data_offset + len(data), len(key), len(value))
+            data += key + value
+
+        temp_path = f"{self._path}.{os.getpid()}.tmp"
+        # Снимок содержит refresh-токены - доступен только владельцу
+        with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as file:
+            file.write(self.HEADER.pack(0, capacity, len(sessions)))
+            file.write(table)
+            file.write(data)
+        published_fd = os.open(temp_path, os.O_RDWR)
+
+        previous_fd = self._published_fd
+        if previous_fd is None:
+            # Снимок предыдущего владельца синхронизации
+            try:
+                previous_fd = os.open(self._path, os.O_RDWR)
+            except FileNotFoundError:
+                pass
+
+        os.rename(temp_path, self._path)
+        self._published_fd = published_fd
+        if previous_fd is not None:
+            os.pwrite(previous_fd, b"\x01", 0)
+            os.close(previous_fd)
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._published_fd is not None:
+            os.close(self._published_fd)
+            self._published_fd = None
+
+    def _snapshot(self) -> mmap.mmap | None:
+        if self._mm is not None and not self._mm[0]:
+            return self._mm
+        if self._mm is None and time.monotonic() - self._opened_at < self.REOPEN_INTERVAL:
+            return None
+        self._reopen()
+        return self._mm
+
+    def _reopen(self) -> None:
+        self._opened_at = time.monotonic()
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        try:
+            with open(self._path, "rb") as file:
+                self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            return
+        self._capacity = self.HEADER.unpack_from(self._mm, 0)[1]
+
+    @staticmethod
+    def _hash(key: bytes) -> int:
+        return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") or 1
+
+
+class HostLock:
+    """
+    Эксклюзивная блокировка на хост (flock): ее владелец выполняет синхронизацию
+
+    Блокировка освобождается ядром при завершении процесса, после чего
+    ее может получить другой воркер
+    """
+
+    def __init__(self, path: str = "/dev/shm/vacancy-service-reauth.lock"):
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self.acquired = False
+
+    def try_acquire(self) -> bool:
+        if not self.acquired:
+            try:
+                fcntl.flock(self._fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self.acquired = True
+            except BlockingIOError:
+                pass
+        return self.acquired
+
+    def release(self) -> None:
+        if self.acquired:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            self.acquired = False
+        os.close(self._fd)
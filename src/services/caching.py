@@ -0,0 +1,196 @@
+import asyncio
+import copy
+import inspect
+import logging
+import time
+from dataclasses import dataclass, asdict
+from functools import wraps
+from typing import Any, Protocol
+
+from src import exceptions
+from src.services.repository.base import BaseRepository
+
+
+class CacheBackend(Protocol):
+    """
+    Хранилище кэша прикладных сервисов (MemoryCache или общий между воркерами кэш)
+    """
+
+    def get(self, key: str, default: Any = None) -> Any: ...
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None: ...
+
+    def delete(self, key: str, broadcast: bool = True) -> None: ...
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    fresh_until: float  # time.time(), значение одинаково для всех процессов
+    not_found: bool = False
+
+
+@dataclass
+class CacheMetrics:
+    hits: int = 0
+    stale_hits: int = 0
+    negative_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+
+
+_metrics: dict[str, CacheMetrics] = {}
+_refreshing: set[str] = set()
+_inflight: dict[str, asyncio.Future] = {}
+_refresh_tasks: set[asyncio.Task] = set()
+
+
+def get_cache_metrics() -> dict[str, dict]:
+    """
+    Метрики кэша прикладных сервисов по пространствам имен
+
+    :return:
+    """
+    return {namespace: asdict(metrics) for namespace, metrics in _metrics.items()}
+
+
+def cached(
+        namespace: str,
+        ttl: float = 30,
+        stale_ttl: float = 0,
+        negative_ttl: float = 0,
+        backend: str = "_cache",
+):
+    """
+    Caching decorator for ApplicationServices
+
+    Результат кэшируется под ключом "<namespace>:<аргументы>", поэтому
+    метод не должен зависеть от _current_user: проверки прав выполняются
+    декораторами permission_filter/state_filter снаружи или вызывающим
+    методом после получения результата из кэша.
+
+    Аргументы в ключе - значения всех параметров в порядке сигнатуры
+    (с учетом значений по умолчанию), поэтому ключ не зависит от способа
+    вызова. Ключ для инвалидации строит метод.cache_key(аргументы без self).
+
+    Устаревшая (старше ttl, но моложе ttl + stale_ttl) запись возвращается
+    сразу, а обновляется в фоне в новой сессии БД (нужно поле '_db_lazy_session').
+    NotFound кэшируется на negative_ttl секунд.
+
+    Одновременные промахи по одному ключу объединяются: запрос к БД
+    выполняет первый вызов, остальные ждут его результат.
+
+    :param namespace: пространство имен ключей (по нему же выполняется инвалидация)
+    :param ttl: время актуальности записи
+    :param stale_ttl: время, в течение которого отдается устаревшая запись
+    :param negative_ttl: время кэширования NotFound (0 - не кэшировать)
+    :param backend: поле сервиса с хранилищем кэша
+    :return: decorator
+    """
+    metrics = _metrics.setdefault(namespace, CacheMetrics())
+
+    def decorator(func):
+        signature = inspect.signature(func)
+        service_parameter = next(iter(signature.parameters))
+
+        def cache_key(*args, **kwargs) -> str:
+            bound = signature.bind(None, *args, **kwargs)
+            bound.apply_defaults()
+            return ":".join([
+                namespace,
+                *(str(value) for name, value in bound.arguments.items() if name != service_parameter)
+            ])
+
+        async def load(service, key: str, cache: CacheBackend, *args, **kwargs) -> Any:
+            try:
+                value = await func(service, *args, **kwargs)
+            except exceptions.NotFound as error:
+                if negative_ttl > 0:
+                    cache.set(
+                        key,
+                        CacheEntry(value=error.message, fresh_until=time.time() + negative_ttl, not_found=True),
+                        ttl=negative_ttl
+                    )
+                raise
+            cache.set(key, CacheEntry(value=value, fresh_until=time.time() + ttl), ttl=ttl + stale_ttl)
+            return value
+
+        async def lead(service, key: str, cache: CacheBackend, *args, **kwargs) -> Any:
+            flight = asyncio.get_running_loop().create_future()
+            _inflight[key] = flight
+            try:
+                value = await load(service, key, cache, *args, **kwargs)
+            except asyncio.CancelledError:
+                flight.cancel()
+                raise
+            except Exception as error:
+                flight.set_exception(error)
+                flight.exception()  # ожидающих может не быть
+                raise
+            else:
+                flight.set_result(value)
+                return value
+            finally:
+                _inflight.pop(key, None)
+
+        async def refresh(service, key: str, cache: CacheBackend, *args, **kwargs) -> None:
+            try:
+                async with service._db_lazy_session() as session:
+                    # Репозитории сервиса привязаны к сессии запроса, которая будет закрыта
+                    detached = copy.copy(service)
+                    for name, value in vars(service).items():
+                        if isinstance(value, BaseRepository):
+                            setattr(detached, name, value.bind(session))
+                    await load(detached, key, cache, *args, **kwargs)
+                metrics.refreshes += 1
+            except exceptions.NotFound:
+                cache.delete(key, broadcast=False)
+            except Exception as error:
+                metrics.refresh_errors += 1
+                logging.warning(f"Не удалось обновить запись кэша {key}: {error!r}")
+            finally:
+                _refreshing.discard(key)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            service = args[0]
+            cache: CacheBackend = getattr(service, backend)
+            key = cache_key(*args[1:], **kwargs)
+
+            entry: CacheEntry = cache.get(key)
+            while entry is None:
+                flight = _inflight.get(key)
+                if flight is None:
+                    metrics.misses += 1
+                    return await lead(service, key, cache, *args[1:], **kwargs)
+
+                metrics.coalesced += 1
+                try:
+                    return await asyncio.shield(flight)
+                except asyncio.CancelledError:
+                    if not flight.cancelled():
+                        raise
+                    # Первый вызов отменен (клиент отключился) - загрузку начинает один из ожидающих
+
+            if entry.not_found:
+                metrics.negative_hits += 1
+                raise exceptions.NotFound(entry.value)
+
+            if entry.fresh_until > time.time():
+                metrics.hits += 1
+                return entry.value
+
+            metrics.stale_hits += 1
+            if key not in _refreshing:
+                _refreshing.add(key)
+                task = asyncio.create_task(refresh(service, key, cache, *args[1:], **kwargs))
+                _refresh_tasks.add(task)
+                task.add_done_callback(_refresh_tasks.discard)
+            return entry.value
+
+        wrapper.cache_key = cache_key
+        return wrapper
+
+    return decorator
@@ -1,19 +1,27 @@
 from .file import FileRepo
 from .vacancy import VacancyRepo
+from .vacancy_summary import VacancySummaryRepo
 from .testing import TestingRepo
 from .attempt import AttemptRepo
+from .attempt_rollup import AttemptRollupRepo
 from .theoretical_question import TheoreticalQuestionRepo
 from .practical_question import PracticalQuestionRepo
 from .answer_option import AnswerOptionRepo
 
 
 class RepoFactory:
-    def __init__(self, session):
+    def __init__(self, session, search_index=None, autocomplete=None):
         self._session = session
+        self._search_index = search_index
+        self._autocomplete = autocomplete
 
     @property
     def vacancy(self) -> VacancyRepo:
-        return VacancyRepo(self._session)
+        return VacancyRepo(self._session, search_index=self._search_index, autocomplete=self._autocomplete)
+
+    @property
+    def vacancy_summary(self) -> VacancySummaryRepo:
+        return VacancySummaryRepo(self._session)
 
     @property
     def file(self) -> FileRepo:
@@ -27,6 +35,10 @@ class RepoFactory:
     def attempt(self) -> AttemptRepo:
         return AttemptRepo(self._session)
 
+    @property
+    def attempt_rollup(self) -> AttemptRollupRepo:
+        return AttemptRollupRepo(self._session)
+
     @property
     def theoretical_question(self) -> TheoreticalQuestionRepo:
         return TheoreticalQuestionRepo(self._session)
@@ -1,7 +1,8 @@
+from typing import Iterable
 from uuid import UUID
 
-from sqlalchemy import select, text, func, or_, and_, case
-from sqlalchemy.orm import subqueryload, joinedload
+from sqlalchemy import select, text, func, or_, and_, case, true, distinct, tuple_
+from sqlalchemy.orm import subqueryload, joinedload, contains_eager
 
 from src.models import tables
 from src.services.repository.base import BaseRepository
@@ -70,15 +71,161 @@ class AttemptRepo(BaseRepository[tables.Attempt]):
             offset: int = 0,
             order_by: str = "id",
             as_full: bool = False,
+            test_columns: Iterable[str] = None,
             **kwargs
     ) -> list[tables.Attempt]:
-        req = select(self.table).filter_by(**kwargs)
-        if as_full:
-            req = req.options(joinedload(self.table.test))
+        sort_column = self.sort_column(order_by)
+        req = (
+            self.__select(order_by, as_full, test_columns, **kwargs)
+            .order_by(sort_column, self.table.id)
+            .limit(limit)
+            .offset(offset)
+        )
 
-        result = (await self._session.execute(req.order_by(text(order_by)).limit(limit).offset(offset))).unique()
+        result = (await self._session.execute(req)).unique()
         return result.scalars().all()
 
+    async def get_page(
+            self,
+            limit: int = 100,
+            order_by: str = "id",
+            as_full: bool = False,
+            offset: int = 0,
+            after: tuple = None,
+            before: tuple = None,
+            test_columns: Iterable[str] = None,
+            **kwargs
+    ) -> tuple[list[tables.Attempt], bool]:
+        """
+        Получает страницу попыток по ключу (order_by, id) без OFFSET
+
+        :param limit: количество записей
+        :param order_by: поле сортировки (title - название тестирования)
+        :param as_full: загрузить тестирование
+        :param offset: смещение (только для первого запроса, без after/before)
+        :param after: (значение order_by, id) - записи после позиции
+        :param before: (значение order_by, id) - записи перед позицией
+        :param test_columns: загружаемые поля тестирования (по умолчанию - все)
+        :param kwargs: filter by
+        :return: записи в порядке сортировки и признак наличия записей дальше по направлению обхода
+        """
+        sort_column = self.sort_column(order_by)
+        req = self.__select(order_by, as_full, test_columns, **kwargs).limit(limit + 1)
+
+        if before is not None:
+            req = (
+                req
+                .where(tuple_(sort_column, self.table.id) < tuple_(*before))
+                .order_by(sort_column.desc(), self.table.id.desc())
+            )
+        else:
+            if after is not None:
+                req = req.where(tuple_(sort_column, self.table.id) > tuple_(*after))
+            else:
+                req = req.offset(offset)
+            req = req.order_by(sort_column, self.table.id)
+
+        records = list((await self._session.execute(req)).unique().scalars().all())
+        has_more = len(records) > limit
+        records = records[:limit]
+        if before is not None:
+            records.reverse()
+        return records, has_more
+
+    def sort_column(self, order_by: str):
+        if order_by == "title":
+            return tables.Testing.title
+        return getattr(self.table, order_by)
+
+    def __select(self, order_by: str, as_full: bool, test_columns: Iterable[str] = None, **kwargs):
+        req = select(self.table).where(*[getattr(self.table, field) == value for field, value in kwargs.items()])
+
+        # Сортировка по названию тестирования требует явного join
+        if order_by == "title":
+            req = req.join(self.table.test)
+            loader = contains_eager(self.table.test) if as_full else None
+        else:
+            loader = joinedload(self.table.test) if as_full else None
+
+        if loader is not None:
+            if test_columns:
+                # Списки попыток не нуждаются в content тестирования (до 32000 символов)
+                loader = loader.load_only(
+                    *[getattr(tables.Testing, column) for column in test_columns], raiseload=True
+                )
+            req = req.options(loader)
+        return req
+
+    async def get_score_distribution(
+            self,
+            test_id: UUID,
+            correct_percent: int,
+            graded_only: bool = False,
+            bucket_size: int = 10,
+    ) -> dict:
+        """
+        Считает распределение результатов попыток тестирования на стороне БД
+
+        :param test_id: id тестирования
+        :param correct_percent: проходной процент
+        :param graded_only: учитывать только проверенные попытки
+        (практические попытки создаются с percent=0 и проверяются в фоне)
+        :param bucket_size: ширина столбца гистограммы в процентах
+        :return:
+        """
+        percent = self.table.percent
+        is_graded = self.table.updated_at.is_not(None) if graded_only else true()
+
+        summary_stmt = (
+            select(
+                func.count().filter(is_graded).label("attempts"),
+                func.count().filter(~is_graded).label("pending"),
+                func.count(distinct(self.table.user_id)).filter(is_graded).label("users"),
+                func.count().filter(and_(is_graded, percent >= correct_percent)).label("passed"),
+                func.avg(percent).filter(is_graded).label("mean"),
+                *[
+                    func.percentile_cont(q / 100).within_group(percent).filter(is_graded).label(f"p{q}")
+                    for q in (25, 50, 75, 90)
+                ],
+            )
+            .where(self.table.test_id == test_id)
+        )
+
+        # Последний столбец включает в себя 100%
+        bucket = (func.least(percent, 100 - bucket_size) // bucket_size).label("bucket")
+        histogram_stmt = (
+            select(bucket, func.count().label("count"))
+            .where(self.table.test_id == test_id, is_graded)
+            .group_by(bucket)
+        )
+
+        summary = (await self._session.execute(summary_stmt)).one()
+        histogram = {
+            int(record.bucket): record.count
+            for record in (await self._session.execute(histogram_stmt)).all()
+        }
+
+        return {
+            "attempts": summary.attempts,
+            "pending": summary.pending,
+            "users": summary.users,
+            "passed": summary.passed,
+            "mean": float(summary.mean) if summary.mean is not None else None,
+            "percentiles": {
+                f"p{q}": getattr(summary, f"p{q}")
+                for q in (25, 50, 75, 90)
+                if getattr(summary, f"p{q}") is not None
+            },
+            "histogram": [
+                {
+                    "start": index * bucket_size,
+                    "end": 100 if index == 100 // bucket_size - 1 else (index + 1) * bucket_size - 1,
+                    "count": histogram.get(index, 0)
+                }
+                for index in range(100 // bucket_size)
+            ],
+        }
+
     async def get_successful_requests(self) -> list[dict]:
         stmt = (
             select(
@@ -0,0 +1,187 @@
+from datetime import datetime, timezone
+from uuid import UUID
+
+from sqlalchemy import select, delete, func, literal, or_, and_
+from sqlalchemy.dialects.postgresql import insert
+
+from src.models import tables
+from src.models.rollup import RollupBucket
+from src.models.state import TestType
+from src.services.repository.base import BaseRepository
+
+
+def truncate(moment: datetime, bucket: RollupBucket) -> datetime:
+    """
+    Округляет время вниз до начала часа или дня (UTC)
+
+    :param moment:
+    :param bucket:
+    :return:
+    """
+    moment = moment.astimezone(timezone.utc)
+    if bucket == RollupBucket.DAY:
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+class AttemptRollupRepo(BaseRepository[tables.AttemptRollup]):
+    table = tables.AttemptRollup
+
+    async def increment(
+            self,
+            testing_id: UUID,
+            vacancy_id: UUID,
+            at: datetime,
+            attempts: int = 0,
+            graded: int = 0,
+            passed: int = 0,
+            percent_sum: int = 0,
+    ) -> None:
+        """
+        Инкрементально обновляет часовой и дневной агрегат попыток
+
+        :param testing_id: id тестирования
+        :param vacancy_id: id вакансии
+        :param at: время создания попытки
+        :param attempts: количество новых попыток
+        :param graded: количество проверенных попыток
+        :param passed: количество успешных попыток
+        :param percent_sum: сумма процентов проверенных попыток
+        :return:
+        """
+        stmt = insert(self.table).values([
+            dict(
+                bucket=bucket,
+                bucket_start=truncate(at, bucket),
+                testing_id=testing_id,
+                vacancy_id=vacancy_id,
+                attempts=attempts,
+                graded=graded,
+                passed=passed,
+                percent_sum=percent_sum,
+            )
+            for bucket in RollupBucket
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.table.bucket, self.table.bucket_start, self.table.testing_id],
+            set_={
+                "attempts": self.table.attempts + stmt.excluded.attempts,
+                "graded": self.table.graded + stmt.excluded.graded,
+                "passed": self.table.passed + stmt.excluded.passed,
+                "percent_sum": self.table.percent_sum + stmt.excluded.percent_sum,
+                "updated_at": func.now(),
+            }
+        )
+        await self._session.execute(stmt)
+        await self._session.commit()
+
+    async def rebuild(self, since: datetime = None) -> None:
+        """
+        Пересчитывает агрегаты по таблице попыток (backfill)
+
+        :param since: пересчитать начиная с этого дня (по умолчанию - вся история)
+        :return:
+        """
+        attempt = tables.Attempt
+        testing = tables.Testing
+
+        is_graded = or_(testing.type == TestType.THEORETICAL, attempt.updated_at.is_not(None))
+
+        if since is not None:
+            since = truncate(since, RollupBucket.DAY)
+            await self._session.execute(delete(self.table).where(self.table.bucket_start >= since))
+        else:
+            await self._session.execute(delete(self.table))
+
+        for bucket in RollupBucket:
+            bucket_start = func.timezone(
+                "UTC", func.date_trunc(bucket.value, func.timezone("UTC", attempt.created_at))
+            ).label("bucket_start")
+
+            source = (
+                select(
+                    literal(bucket, self.table.bucket.type).label("bucket"),
+                    bucket_start,
+                    attempt.test_id,
+                    testing.vacancy_id,
+                    func.count().label("attempts"),
+                    func.count().filter(is_graded).label("graded"),
+                    func.count().filter(
+                        and_(is_graded, attempt.percent >= testing.correct_percent)
+                    ).label("passed"),
+                    func.coalesce(func.sum(attempt.percent).filter(is_graded), 0).label("percent_sum"),
+                )
+                .join(testing, attempt.test_id == testing.id)
+                .group_by(bucket_start, attempt.test_id, testing.vacancy_id)
+            )
+            if since is not None:
+                source = source.where(attempt.created_at >= since)
+
+            await self._session.execute(
+                insert(self.table).from_select(
+                    ["bucket", "bucket_start", "testing_id", "vacancy_id", "attempts", "graded", "passed",
+                     "percent_sum"],
+                    source
+                )
+            )
+
+        await self._session.commit()
+
+    async def get_series(
+            self,
+            bucket: RollupBucket,
+            since: datetime,
+            until: datetime,
+            vacancy_id: UUID = None,
+            testing_id: UUID = None,
+            by_testing: bool = True,
+    ) -> list[dict]:
+        """
+        Получает временной ряд агрегатов попыток
+
+        :param bucket: размер интервала
+        :param since: начало периода
+        :param until: конец периода
+        :param vacancy_id: фильтр по вакансии
+        :param testing_id: фильтр по тестированию
+        :param by_testing: группировать по тестированиям (иначе - только по вакансиям)
+        :return:
+        """
+        group_columns = [self.table.bucket_start, self.table.vacancy_id]
+        if by_testing:
+            group_columns.append(self.table.testing_id)
+
+        stmt = (
+            select(
+                *group_columns,
+                func.sum(self.table.attempts).label("attempts"),
+                func.sum(self.table.graded).label("graded"),
+                func.sum(self.table.passed).label("passed"),
+                func.sum(self.table.percent_sum).label("percent_sum"),
+            )
+            .where(
+                self.table.bucket == bucket,
+                self.table.bucket_start >= truncate(since, bucket),
+                self.table.bucket_start <= until,
+            )
+            .group_by(*group_columns)
+            .order_by(*group_columns)
+        )
+        if vacancy_id:
+            stmt = stmt.where(self.table.vacancy_id == vacancy_id)
+        if testing_id:
+            stmt = stmt.where(self.table.testing_id == testing_id)
+
+        result = await self._session.execute(stmt)
+        return [
+            {
+                "bucket_start": record.bucket_start,
+                "vacancy_id": record.vacancy_id,
+                "testing_id": record.testing_id if by_testing else None,
+                "attempts": record.attempts,
+                "graded": record.graded,
+                "passed": record.passed,
+                "mean_percent": record.percent_sum / record.graded if record.graded else None,
+            }
+            for record in result.all()
+        ]
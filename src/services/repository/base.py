@@ -1,3 +1,4 @@
+import copy
 import uuid
 from typing import Generic, Type, TypeVar, Optional
 
@@ -13,6 +14,17 @@ class BaseRepository(Generic[T]):
     def __init__(self, session: AsyncSession):
         self._session = session
 
+    def bind(self, session: AsyncSession) -> "BaseRepository[T]":
+        """
+        Копия репозитория, работающая в другой сессии
+
+        :param session:
+        :return:
+        """
+        repo = copy.copy(self)
+        repo._session = session
+        return repo
+
     async def create(self, **kwargs) -> T:
         """
         Создает запись в БД
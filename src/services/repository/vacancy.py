@@ -1,62 +1,398 @@
-from sqlalchemy import select, text, func, or_, and_
-from sqlalchemy.orm import subqueryload
+import uuid
+from datetime import datetime
+from typing import Literal, Iterable
+
+from sqlalchemy import select, delete, case, func, or_, and_, cast, literal, tuple_, union_all, true, false, any_
+from sqlalchemy.dialects.postgresql import REGCONFIG, insert
+from sqlalchemy.orm import subqueryload, load_only, contains_eager
 
 from src.models import tables
+from src.models.state import VacancyState
+from src.services.search import InvertedIndex, TitleAutocomplete
 from .base import BaseRepository
 
 
 class VacancyRepo(BaseRepository[tables.Vacancy]):
     table = tables.Vacancy
 
+    # Конфигурации полнотекстового поиска, по которым построен search_vector
+    SEARCH_CONFIGS = ("russian", "english")
+
+    # Минимальная длина подстроки, для которой триграммный индекс применим к ilike
+    TRIGRAM_MIN_LENGTH = 3
+
+    def __init__(self, session, search_index: InvertedIndex = None, autocomplete: TitleAutocomplete = None):
+        super().__init__(session)
+        self._search_index = search_index
+        self._autocomplete = autocomplete
+
     async def search(
             self,
             query: str,
-            fields: list[str],
             limit: int = 100,
             offset: int = 0,
             order_by: str = "created_at",
+            mode: Literal["fulltext", "fuzzy"] = "fulltext",
+            columns: Iterable[str] = None,
+            with_summary: bool = False,
             **kwargs
     ) -> list[tables.Vacancy]:
+        """
+        Поиск вакансий
+
+        * fulltext - полнотекстовый поиск по заголовку и содержанию
+        * fuzzy - поиск по заголовку с учетом опечаток и по подстроке (pg_trgm)
+
+        Результаты отсортированы по релевантности, затем по order_by
+
+        Если задан внутрипроцессный индекс (SEARCH.BACKEND = memory), поиск
+        в обоих режимах выполняется по нему с ранжированием BM25 без SQL,
+        а найденные вакансии загружаются по первичному ключу
+
+        :param query: поисковый запрос
+        :param limit:
+        :param offset:
+        :param order_by:
+        :param mode: режим поиска
+        :param columns: загружаемые поля (по умолчанию - все, кроме отложенных)
+        :param with_summary: загрузить сводку вакансии тем же запросом
+        :param kwargs: filter by
+        :return:
+        """
+        if self._search_index is not None:
+            return await self.__search_index(
+                query=query,
+                limit=limit,
+                offset=offset,
+                columns=columns,
+                with_summary=with_summary,
+                **kwargs
+            )
+
         return await self.__get_range(
             query=query,
-            fields=fields,
+            mode=mode,
             limit=limit,
             offset=offset,
             order_by=order_by,
+            columns=columns,
+            with_summary=with_summary,
             **kwargs
         )
 
+    async def suggest_title(self, query: str, **kwargs) -> str | None:
+        """
+        Подбирает наиболее похожий заголовок вакансии ("возможно, вы имели в виду")
+
+        :param query: поисковый запрос
+        :param kwargs: filter by
+        :return: заголовок или None
+        """
+        stmt = (
+            select(self.table.title)
+            .filter_by(**kwargs)
+            .where(self._title_similar(query))
+            .order_by(func.word_similarity(query, self.table.title).desc())
+            .limit(1)
+        )
+        return (await self._session.execute(stmt)).scalars().first()
+
+    async def autocomplete_titles(self, query: str, state, limit: int = 10) -> list[tuple[uuid.UUID, str]]:
+        """
+        Подбирает заголовки вакансий по началу заголовка или его слова
+
+        :param query: введенная часть заголовка
+        :param state: статус вакансий
+        :param limit: количество подсказок
+        :return: [(id вакансии, заголовок)]
+        """
+        if self._autocomplete is not None:
+            return self._autocomplete.suggest(query, state=state, limit=limit)
+
+        stmt = (
+            select(self.table.id, self.table.title)
+            .where(
+                self.table.state == state,
+                self.table.title.ilike(f"{self._escape_like(query)}%", escape="/")
+            )
+            .order_by(func.length(self.table.title), self.table.title)
+            .limit(limit)
+        )
+        return [(record.id, record.title) for record in (await self._session.execute(stmt)).all()]
+
     async def get_all(
             self, limit: int = 100,
             offset: int = 0,
             order_by: str = "id",
+            columns: Iterable[str] = None,
+            with_summary: bool = False,
             **kwargs
     ) -> list[tables.Vacancy]:
         return await self.__get_range(
             limit=limit,
             offset=offset,
             order_by=order_by,
+            columns=columns,
+            with_summary=with_summary,
             **kwargs
         )
 
+    async def get_page(
+            self,
+            limit: int = 100,
+            order_by: str = "id",
+            offset: int = 0,
+            after: tuple = None,
+            before: tuple = None,
+            columns: Iterable[str] = None,
+            with_summary: bool = False,
+            **kwargs
+    ) -> tuple[list[tables.Vacancy], bool]:
+        """
+        Получает страницу записей по ключу (order_by, id) без OFFSET
+
+        :param limit: количество записей
+        :param order_by: поле сортировки
+        :param offset: смещение (только для первого запроса, без after/before)
+        :param after: (значение order_by, id) - записи после позиции
+        :param before: (значение order_by, id) - записи перед позицией
+        :param columns: загружаемые поля (по умолчанию - все, кроме отложенных)
+        :param with_summary: загрузить сводку вакансии тем же запросом
+        :param kwargs: filter by
+        :return: записи в порядке сортировки и признак наличия записей дальше по направлению обхода
+        """
+        sort_column = self.sort_column(order_by)
+        stmt = (
+            select(self.table)
+            .filter_by(**kwargs)
+            .limit(limit + 1)
+        )
+        if columns:
+            stmt = stmt.options(self._load_only(columns))
+        if with_summary:
+            stmt = self._with_summary(stmt)
+
+        if before is not None:
+            stmt = (
+                stmt
+                .where(tuple_(sort_column, self.table.id) < tuple_(*before))
+                .order_by(sort_column.desc(), self.table.id.desc())
+            )
+        else:
+            if after is not None:
+                stmt = stmt.where(tuple_(sort_column, self.table.id) > tuple_(*after))
+            else:
+                stmt = stmt.offset(offset)
+            stmt = stmt.order_by(sort_column, self.table.id)
+
+        records = list((await self._session.execute(stmt)).scalars().all())
+        has_more = len(records) > limit
+        records = records[:limit]
+        if before is not None:
+            records.reverse()
+        return records, has_more
+
+    async def get_by_ids(
+            self,
+            ids: Iterable[uuid.UUID],
+            columns: Iterable[str] = None,
+            **kwargs
+    ) -> list[tables.Vacancy]:
+        """
+        Получает вакансии по списку id одним запросом
+
+        :param ids: id вакансий
+        :param columns: загружаемые поля (по умолчанию - все, кроме отложенных)
+        :param kwargs: filter by
+        :return: найденные вакансии (порядок не гарантируется)
+        """
+        ids = list(ids)
+        if not ids:
+            return []
+        stmt = select(self.table).filter_by(**kwargs).where(self.table.id == any_(ids))
+        if columns:
+            stmt = stmt.options(self._load_only(columns))
+        return (await self._session.execute(stmt)).scalars().all()
+
+    async def get_changes(
+            self,
+            after: tuple[datetime, uuid.UUID],
+            until: datetime,
+            limit: int = 100,
+            state: VacancyState = None
+    ) -> list:
+        """
+        Получает измененные и удаленные вакансии по ключу (время изменения, id)
+
+        :param after: (время изменения, id) - изменения после позиции
+        :param until: изменения строго до этого времени
+        :param limit: количество записей
+        :param state: только вакансии в этом статусе (для отметок об удалении
+            OPENED - вакансия была открыта до удаления или закрытия)
+        :return: строки (id, changed_at, deleted) в порядке изменения
+        """
+        changed_at = self.sort_column("updated_at")
+        tombstone = tables.VacancyTombstone
+
+        changed = (
+            select(
+                self.table.id.label("id"),
+                changed_at.label("changed_at"),
+                false().label("deleted"),
+            )
+            .where(
+                tuple_(changed_at, self.table.id) > tuple_(*after),
+                changed_at < until,
+                *[self.table.state == state] if state else [],
+            )
+            .order_by(changed_at, self.table.id)
+            .limit(limit)
+        )
+        deleted = (
+            select(
+                tombstone.vacancy_id.label("id"),
+                tombstone.deleted_at.label("changed_at"),
+                true().label("deleted"),
+            )
+            .where(
+                tuple_(tombstone.deleted_at, tombstone.vacancy_id) > tuple_(*after),
+                tombstone.deleted_at < until,
+                *[tombstone.state == state] if state else [],
+            )
+            .order_by(tombstone.deleted_at, tombstone.vacancy_id)
+            .limit(limit)
+        )
+        # Каждая ветка читает не более limit строк по своему индексу
+        changes = union_all(changed, deleted).subquery()
+        stmt = (
+            select(changes)
+            .order_by(changes.c.changed_at, changes.c.id)
+            .limit(limit)
+        )
+        return list((await self._session.execute(stmt)).all())
+
+    async def create(self, **kwargs) -> tables.Vacancy:
+        vacancy = await super().create(**kwargs)
+        self._index(vacancy.id, vacancy.title, vacancy.content, vacancy.state)
+        return vacancy
+
+    async def update(self, id: uuid.UUID, **kwargs) -> None:
+        await super().update(id, **kwargs)
+        if kwargs and (self._search_index is not None or self._autocomplete is not None):
+            record = (await self._session.execute(
+                select(self.table.title, self.table.content, self.table.state).where(self.table.id == id)
+            )).first()
+            if record:
+                self._index(id, record.title, record.content, record.state)
+
+    async def get_search_documents(self, with_content: bool = True, ids: Iterable[uuid.UUID] = None) -> list:
+        """
+        Получает данные вакансий для построения поисковых индексов
+
+        :param with_content: загрузить содержание
+        :param ids: id вакансий (по умолчанию - все)
+        :return: строки (id, title, content, state)
+        """
+        stmt = select(
+            self.table.id,
+            self.table.title,
+            self.table.content if with_content else literal(None).label("content"),
+            self.table.state
+        )
+        if ids is not None:
+            stmt = stmt.where(self.table.id == any_(list(ids)))
+        return list((await self._session.execute(stmt)).all())
+
+    async def set_hidden(self, id: uuid.UUID, hidden: bool) -> None:
+        """
+        Отмечает закрытие открытой вакансии или снимает отметку при ее открытии
+
+        Отметка с состоянием OPENED передается в vacancy/changes пользователям
+        без доступа к закрытым вакансиям как удаление. Выполняется без commit:
+        отметка сохраняется в транзакции изменения вакансии
+
+        :param id:
+        :param hidden: вакансия закрыта
+        :return:
+        """
+        tombstone = tables.VacancyTombstone
+        if hidden:
+            stmt = insert(tombstone).values(vacancy_id=id, state=VacancyState.OPENED)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[tombstone.vacancy_id],
+                set_={"state": VacancyState.OPENED, "deleted_at": func.now()}
+            )
+        else:
+            stmt = delete(tombstone).where(tombstone.vacancy_id == id)
+        await self._session.execute(stmt)
+
+    async def delete(self, id: uuid.UUID) -> None:
+        """
+        Удаляет вакансию, оставляя отметку об удалении в той же транзакции
+
+        Отметка о закрытии ранее открытой вакансии сохраняет состояние OPENED,
+        чтобы удаление получили пользователи без доступа к закрытым вакансиям
+
+        :param id:
+        :return:
+        """
+        tombstone = tables.VacancyTombstone
+        stmt = insert(tombstone).from_select(
+            ["vacancy_id", "state"],
+            select(self.table.id, self.table.state).where(self.table.id == id)
+        )
+        await self._session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[tombstone.vacancy_id],
+                set_={
+                    "state": case(
+                        (tombstone.state == VacancyState.OPENED, tombstone.state),
+                        else_=stmt.excluded.state
+                    ),
+                    "deleted_at": func.now(),
+                }
+            )
+        )
+        await super().delete(id)
+        if self._search_index is not None:
+            self._search_index.remove(id)
+        if self._autocomplete is not None:
+            self._autocomplete.remove(id)
+
+    def sort_column(self, order_by: str):
+        """
+        Выражение сортировки для поля order_by
+
+        updated_at не заполняется при создании, поэтому сортируем по
+        времени последнего изменения coalesce(updated_at, created_at)
+        """
+        if order_by == "updated_at":
+            return func.coalesce(self.table.updated_at, self.table.created_at)
+        return getattr(self.table, order_by)
+
     async def __get_range(
             self,
             *,
             query: str = None,
-            fields: list[str] = None,
+            mode: Literal["fulltext", "fuzzy"] = "fulltext",
             limit: int = 100,
             offset: int = 0,
             order_by: str = "id",
+            columns: Iterable[str] = None,
+            with_summary: bool = False,
             **kwargs
     ) -> list[tables.Vacancy]:
         stmt = (
             select(
                 self.table,
             )
-            .order_by(text(order_by))
             .limit(limit)
             .offset(offset)
         )
+        if columns:
+            stmt = stmt.options(self._load_only(columns))
+        if with_summary:
+            stmt = self._with_summary(stmt)
 
         # Фильтры kwargs
         stmt = stmt.where(
@@ -64,9 +400,78 @@ class VacancyRepo(BaseRepository[tables.Vacancy]):
         )
 
         # Поиск
-        if query and fields:
-            stmt = stmt.where(
-                or_(*[getattr(self.table, field).ilike(f"%{query}%") for field in fields])
+        if query and mode == "fuzzy":
+            condition = self._title_similar(query)
+            if len(query) >= self.TRIGRAM_MIN_LENGTH:
+                condition = or_(condition, self.table.title.ilike(f"%{self._escape_like(query)}%", escape="/"))
+
+            stmt = (
+                stmt
+                .where(condition)
+                .order_by(func.word_similarity(query, self.table.title).desc())
             )
+        elif query:
+            ts_query = self._ts_query(query)
+            stmt = (
+                stmt
+                .where(self.table.search_vector.op("@@")(ts_query))
+                .order_by(func.ts_rank_cd(self.table.search_vector, ts_query).desc())
+            )
+
+        stmt = stmt.order_by(self.sort_column(order_by), self.table.id)
         result = await self._session.execute(stmt)
         return result.scalars().all()
+
+    async def __search_index(
+            self,
+            *,
+            query: str,
+            limit: int,
+            offset: int,
+            columns: Iterable[str] = None,
+            with_summary: bool = False,
+            **kwargs
+    ) -> list[tables.Vacancy]:
+        ids = self._search_index.search(query, state=kwargs.get("state"))[offset:offset + limit]
+        if not ids:
+            return []
+
+        stmt = select(self.table).where(self.table.id == any_(ids)).filter_by(**kwargs)
+        if columns:
+            stmt = stmt.options(self._load_only(columns))
+        if with_summary:
+            stmt = self._with_summary(stmt)
+        vacancies = {vacancy.id: vacancy for vacancy in (await self._session.execute(stmt)).scalars().all()}
+        return [vacancies[vacancy_id] for vacancy_id in ids if vacancy_id in vacancies]
+
+    def _index(self, vacancy_id: uuid.UUID, title: str, content: str, state) -> None:
+        if self._search_index is not None:
+            self._search_index.add(vacancy_id, title, content, state)
+        if self._autocomplete is not None:
+            self._autocomplete.add(vacancy_id, title, state)
+
+    def _with_summary(self, stmt):
+        return (
+            stmt
+            .outerjoin(self.table.summary)
+            .options(contains_eager(self.table.summary))
+        )
+
+    def _load_only(self, columns: Iterable[str]):
+        # Списки не нуждаются в content (до 32000 символов) - не передаем его из БД
+        return load_only(*[getattr(self.table, column) for column in columns], raiseload=True)
+
+    def _ts_query(self, query: str):
+        ts_queries = [func.websearch_to_tsquery(cast(config, REGCONFIG), query) for config in self.SEARCH_CONFIGS]
+        ts_query = ts_queries[0]
+        for item in ts_queries[1:]:
+            ts_query = ts_query.op("||")(item)
+        return ts_query
+
+    def _title_similar(self, query: str):
+        # query <% title: в заголовке есть слово, похожее на запрос (использует GIN-индекс по триграммам)
+        return literal(query).op("<%")(self.table.title)
+
+    @staticmethod
+    def _escape_like(value: str) -> str:
+        return value.replace("/", "//").replace("%", "/%").replace("_", "/_")
@@ -0,0 +1,99 @@
+from uuid import UUID
+
+from sqlalchemy import select, func, delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased
+
+from src.models import tables
+from src.services.repository.base import BaseRepository
+
+
+class VacancySummaryRepo(BaseRepository[tables.VacancySummary]):
+    table = tables.VacancySummary
+
+    async def increment(self, vacancy_id: UUID, testings: int = 0, files: int = 0) -> None:
+        """
+        Изменяет счетчики тестирований и загруженных файлов вакансии
+
+        :param vacancy_id: id вакансии
+        :param testings: изменение количества тестирований
+        :param files: изменение количества загруженных файлов
+        :return:
+        """
+        stmt = insert(self.table).values(
+            vacancy_id=vacancy_id,
+            testing_count=max(testings, 0),
+            file_count=max(files, 0),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.table.vacancy_id],
+            set_={
+                "testing_count": func.greatest(self.table.testing_count + testings, 0),
+                "file_count": func.greatest(self.table.file_count + files, 0),
+                "updated_at": func.now(),
+            }
+        )
+        await self._session.execute(stmt)
+        await self._session.commit()
+
+    async def set_poster(self, vacancy_id: UUID, file: tables.File | None) -> None:
+        """
+        Обновляет постер вакансии
+
+        :param vacancy_id: id вакансии
+        :param file: файл постера (None - удалить постер)
+        :return:
+        """
+        poster = dict(
+            poster_id=file.id if file else None,
+            poster_filename=file.filename if file else None,
+            poster_content_type=file.content_type if file else None,
+        )
+        stmt = insert(self.table).values(vacancy_id=vacancy_id, testing_count=0, file_count=0, **poster)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[self.table.vacancy_id],
+            set_={**poster, "updated_at": func.now()}
+        )
+        await self._session.execute(stmt)
+        await self._session.commit()
+
+    async def rebuild(self) -> None:
+        """
+        Пересчитывает сводки всех вакансий по исходным таблицам
+
+        :return:
+        """
+        vacancy = tables.Vacancy
+        poster = aliased(tables.File)
+        testing_count = (
+            select(func.count())
+            .where(tables.Testing.vacancy_id == vacancy.id)
+            .correlate(vacancy)
+            .scalar_subquery()
+        )
+        file_count = (
+            select(func.count())
+            .where(tables.File.vacancy_id == vacancy.id, tables.File.is_uploaded.is_(True))
+            .correlate(vacancy)
+            .scalar_subquery()
+        )
+        source = (
+            select(
+                vacancy.id,
+                testing_count,
+                file_count,
+                poster.id,
+                poster.filename,
+                poster.content_type,
+            )
+            .outerjoin(poster, (poster.id == vacancy.poster) & poster.is_uploaded.is_(True))
+        )
+
+        await self._session.execute(delete(self.table))
+        await self._session.execute(
+            insert(self.table).from_select(
+                ["vacancy_id", "testing_count", "file_count", "poster_id", "poster_filename", "poster_content_type"],
+                source
+            )
+        )
+        await self._session.commit()
@@ -0,0 +1,2 @@
+from .inverted_index import InvertedIndex
+from .autocomplete import TitleAutocomplete
@@ -0,0 +1,98 @@
+import bisect
+import uuid
+
+from src.models.state import VacancyState
+from src.utils.formators import tokenize
+
+
+class TitleAutocomplete:
+    """
+    Автодополнение заголовков вакансий по префиксу
+
+    Хранит отсортированный массив нормализованных заголовков и их окончаний
+    с каждого слова ("java developer" -> "java developer", "developer"),
+    поэтому запрос "dev" находит "Java developer". Поиск - бинарный
+    поиск начала диапазона и просмотр ограниченного числа ключей.
+    """
+
+    # Максимальное количество просматриваемых ключей на запрос
+    MAX_SCAN = 1000
+
+    def __init__(self):
+        self._keys: list[tuple[str, uuid.UUID]] = []
+        self._titles: dict[uuid.UUID, tuple[str, VacancyState, list[str]]] = {}
+
+    def add(self, vacancy_id: uuid.UUID, title: str, state: VacancyState) -> None:
+        """
+        Добавляет или заменяет заголовок вакансии
+
+        :param vacancy_id: id вакансии
+        :param title: заголовок
+        :param state: статус вакансии
+        :return:
+        """
+        self.remove(vacancy_id)
+
+        words = tokenize(title)
+        keys = [" ".join(words[index:]) for index in range(len(words))]
+        for key in keys:
+            bisect.insort(self._keys, (key, vacancy_id))
+        self._titles[vacancy_id] = (title, state, keys)
+
+    def remove(self, vacancy_id: uuid.UUID) -> None:
+        """
+        Удаляет заголовок вакансии
+
+        :param vacancy_id: id вакансии
+        :return:
+        """
+        item = self._titles.pop(vacancy_id, None)
+        if item is None:
+            return
+
+        for key in item[2]:
+            index = bisect.bisect_left(self._keys, (key, vacancy_id))
+            if index < len(self._keys) and self._keys[index] == (key, vacancy_id):
+                del self._keys[index]
+
+    def suggest(self, query: str, state: VacancyState, limit: int = 10) -> list[tuple[uuid.UUID, str]]:
+        """
+        Подбирает заголовки вакансий, начинающиеся с запроса или содержащие слово с таким началом
+
+        Сначала - заголовки, начинающиеся с запроса, затем более короткие
+
+        :param query: введенная часть заголовка
+        :param state: статус вакансий
+        :param limit: количество подсказок
+        :return: [(id вакансии, заголовок)]
+        """
+        prefix = " ".join(tokenize(query))
+        if not prefix:
+            return []
+
+        matches: dict[uuid.UUID, bool] = {}
+        start = bisect.bisect_left(self._keys, (prefix,))
+        for key, vacancy_id in self._keys[start:start + self.MAX_SCAN]:
+            if not key.startswith(prefix):
+                break
+            title, title_state, keys = self._titles[vacancy_id]
+            if title_state != state:
+                continue
+            matches[vacancy_id] = matches.get(vacancy_id, False) or key == keys[0]
+
+        ranked = sorted(
+            matches,
+            key=lambda vacancy_id: (
+                not matches[vacancy_id],
+                len(self._titles[vacancy_id][0]),
+                self._titles[vacancy_id][0],
+            )
+        )
+        return [(vacancy_id, self._titles[vacancy_id][0]) for vacancy_id in ranked[:limit]]
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._titles.clear()
+
+    def __len__(self) -> int:
+        return len(self._titles)
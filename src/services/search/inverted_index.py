@@ -0,0 +1,152 @@
+import bisect
+import math
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+
+from src.models.state import VacancyState
+from src.utils.formators import tokenize
+
+
+@dataclass
+class IndexedDocument:
+    state: VacancyState
+    length: float
+    frequencies: dict[str, float]
+
+
+class InvertedIndex:
+    """
+    Внутрипроцессный обратный индекс вакансий с ранжированием BM25
+
+    Используется как бэкенд поиска VacancyRepo вместо полнотекстового
+    поиска Postgres (SEARCH.BACKEND = memory). Строится при запуске
+    и обновляется репозиторием при изменении вакансий.
+
+    Последнее слово запроса ищется также как префикс ("разраб" -> "разработчик").
+    """
+
+    # Вес слов заголовка относительно слов содержания
+    TITLE_WEIGHT = 3.0
+
+    # Максимальное количество слов, в которые разворачивается префикс
+    PREFIX_EXPANSIONS = 50
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self._k1 = k1
+        self._b = b
+        self._documents: dict[uuid.UUID, IndexedDocument] = {}
+        self._postings: dict[str, dict[uuid.UUID, float]] = {}
+        self._terms: list[str] = []  # отсортированный словарь для поиска по префиксу
+        self._total_length = 0.0
+
+    def add(self, vacancy_id: uuid.UUID, title: str, content: str, state: VacancyState) -> None:
+        """
+        Добавляет или заменяет вакансию в индексе
+
+        :param vacancy_id: id вакансии
+        :param title: заголовок
+        :param content: содержание
+        :param state: статус вакансии
+        :return:
+        """
+        self.remove(vacancy_id)
+
+        frequencies = Counter()
+        for term in tokenize(title):
+            frequencies[term] += self.TITLE_WEIGHT
+        for term in tokenize(content):
+            frequencies[term] += 1
+
+        document = IndexedDocument(state=state, length=sum(frequencies.values()), frequencies=dict(frequencies))
+        self._documents[vacancy_id] = document
+        self._total_length += document.length
+
+        for term, frequency in document.frequencies.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[vacancy_id] = frequency
+
+    def remove(self, vacancy_id: uuid.UUID) -> None:
+        """
+        Удаляет вакансию из индекса
+
+        :param vacancy_id: id вакансии
+        :return:
+        """
+        document = self._documents.pop(vacancy_id, None)
+        if document is None:
+            return
+
+        self._total_length -= document.length
+        for term in document.frequencies:
+            postings = self._postings[term]
+            del postings[vacancy_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+
+    def search(self, query: str, state: VacancyState = None) -> list[uuid.UUID]:
+        """
+        Ищет вакансии по запросу
+
+        :param query: поисковый запрос
+        :param state: фильтр по статусу вакансии
+        :return: id вакансий по убыванию релевантности
+        """
+        terms = tokenize(query)
+        if not terms or not self._documents:
+            return []
+
+        # Последнее слово дополнительно разворачивается по префиксу
+        query_terms = {term: 1.0 for term in terms}
+        for term in self._expand_prefix(terms[-1]):
+            query_terms.setdefault(term, 0.5)
+
+        scores: dict[uuid.UUID, float] = {}
+        for term, weight in query_terms.items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self._idf(len(postings))
+            for vacancy_id, frequency in postings.items():
+                document = self._documents[vacancy_id]
+                if state is not None and document.state != state:
+                    continue
+                scores[vacancy_id] = scores.get(vacancy_id, 0.0) + weight * idf * self._saturate(
+                    frequency, document.length
+                )
+
+        return sorted(scores, key=lambda vacancy_id: (-scores[vacancy_id], str(vacancy_id)))
+
+    def clear(self) -> None:
+        self._documents.clear()
+        self._postings.clear()
+        self._terms.clear()
+        self._total_length = 0.0
+
+    def _expand_prefix(self, prefix: str) -> list[str]:
+        start = bisect.bisect_left(self._terms, prefix)
+        expansions = []
+        for term in self._terms[start:start + self.PREFIX_EXPANSIONS]:
+            if not term.startswith(prefix):
+                break
+            expansions.append(term)
+        return expansions
+
+    def _idf(self, document_frequency: int) -> float:
+        total = len(self._documents)
+        return math.log(1 + (total - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def _saturate(self, frequency: float, length: float) -> float:
+        average_length = self._total_length / len(self._documents) or 1.0
+        norm = self._k1 * (1 - self._b + self._b * length / average_length)
+        return frequency * (self._k1 + 1) / (frequency + norm)
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, vacancy_id: uuid.UUID) -> bool:
+        return vacancy_id in self._documents
@@ -1,5 +1,7 @@
 import os
 
+from src.services.caching import get_cache_metrics
+
 
 class StatsApplicationService:
 
@@ -16,6 +18,7 @@ class StatsApplicationService:
                     "DEBUG": self._config.DEBUG,
                     "build": os.getenv("BUILD", "unknown"),
                     "branch": os.getenv("BRANCH", "unknown"),
+                    "cache": get_cache_metrics(),
                 }
             )
         return info
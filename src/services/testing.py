@@ -1,7 +1,7 @@
 import base64
 import uuid
-from datetime import datetime, timedelta
-from typing import Literal
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Callable
 from urllib.parse import urljoin
 
 from fastapi import BackgroundTasks
@@ -11,14 +11,19 @@ from src.config import Config
 from src.models import schemas
 from src.models.auth import BaseUser
 from src.models.language import ProgramLanguage
+from src.models.rollup import RollupBucket
 from src.models.permission import Permission
 from src.models.state import VacancyState, UserState, TestType
 from src.services.auth.filters import permission_filter
 from src.services.auth.filters import state_filter
+from src.services.caching import cached
 from src.services.repository import AttemptRepo, VacancyRepo, PracticalQuestionRepo, TheoreticalQuestionRepo, \
-    AnswerOptionRepo
+    AnswerOptionRepo, AttemptRollupRepo, VacancySummaryRepo
 from src.services.repository import TestingRepo
 from src.utils.aiohttp_client import AiohttpClient
+from src.utils.cache import MemoryCache
+from src.utils.etag import conditional_payload
+from src.utils.pagination import decode_page_cursor, page_cursors
 
 
 class TestingApplicationService:
@@ -28,21 +33,27 @@ class TestingApplicationService:
             current_user: BaseUser,
             testing_repo: TestingRepo,
             attempt_repo: AttemptRepo,
+            attempt_rollup_repo: AttemptRollupRepo,
             vacancy_repo: VacancyRepo,
+            vacancy_summary_repo: VacancySummaryRepo,
             practical_question_repo: PracticalQuestionRepo,
             theoretical_question_repo: TheoreticalQuestionRepo,
             answer_option_repo: AnswerOptionRepo,
             http_client: AiohttpClient,
             config: Config,
             db_lazy_session,
+            cache: MemoryCache,
     ):
         self._db_lazy_session = db_lazy_session
+        self._cache = cache
         self._config = config
         self._http_client = http_client
         self._current_user = current_user
         self._repo = testing_repo
         self._attempt_repo = attempt_repo
+        self._attempt_rollup_repo = attempt_rollup_repo
         self._vacancy_repo = vacancy_repo
+        self._vacancy_summary_repo = vacancy_summary_repo
         self._practical_question_repo = practical_question_repo
         self._theoretical_question_repo = theoretical_question_repo
         self._answer_option_repo = answer_option_repo
@@ -55,7 +66,8 @@ class TestingApplicationService:
             page: int = 1,
             per_page: int = 10,
             order_by: Literal["title", "created_at"] = "created_at",
-    ) -> list[schemas.AttemptTest]:
+            cursor: str = None,
+    ) -> schemas.Page[schemas.AttemptTestSmall]:
         """
         Получить список попыток прохождения теста текущего пользователя
 
@@ -63,6 +75,7 @@ class TestingApplicationService:
         :param page: номер страницы (всегда >= 1)
         :param per_page: количество статей на странице (всегда >= 1, но <= per_page_limit)
         :param order_by: поле сортировки
+        :param cursor: курсор страницы (если указан, page игнорируется)
         :return:
 
         """
@@ -77,6 +90,13 @@ class TestingApplicationService:
         if per_page < 1:
             raise exceptions.BadRequest("Неверное количество элементов на странице")
 
+        position = None
+        if cursor:
+            try:
+                position = decode_page_cursor(cursor, order_by, ("created_at",))
+            except ValueError as error:
+                raise exceptions.BadRequest(str(error))
+
         per_page_limit = 40
 
         # Подготовка входных данных
@@ -84,15 +104,31 @@ class TestingApplicationService:
         offset = min((page - 1) * per_page, 2147483646)
 
         # Выполнение запроса
-        attempts = await self._attempt_repo.get_all(
+        attempts, has_more = await self._attempt_repo.get_page(
             limit=per_page,
-            offset=offset,
             order_by=order_by,
             as_full=True,
+            offset=0 if position else offset,
+            after=(position.value, position.id) if position and position.direction == "next" else None,
+            before=(position.value, position.id) if position and position.direction == "prev" else None,
+            test_columns=schemas.TestingSmall.model_fields.keys(),
             user_id=self._current_user.id,
             **{"test_id": testing_id} if testing_id else {}
         )
-        return [schemas.AttemptTest.model_validate(attempt) for attempt in attempts]
+
+        next_cursor, prev_cursor = page_cursors(
+            attempts,
+            order_by=order_by,
+            value_of=lambda attempt: attempt.test.title if order_by == "title" else attempt.created_at,
+            cursor=position,
+            has_more=has_more,
+            offset=offset,
+        )
+        return schemas.Page[schemas.AttemptTestSmall](
+            items=[schemas.AttemptTestSmall.model_validate(attempt) for attempt in attempts],
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+        )
 
     @permission_filter(Permission.GET_USER_TEST_RESULTS)
     @state_filter(UserState.ACTIVE)
@@ -100,6 +136,91 @@ class TestingApplicationService:
         requests = await self._attempt_repo.get_successful_requests()
         return [schemas.ApprovedRequests.model_validate(request) for request in requests]
 
+    @permission_filter(Permission.GET_USER_TEST_RESULTS)
+    @state_filter(UserState.ACTIVE)
+    async def get_testing_stats(self, testing_id: uuid.UUID) -> schemas.TestingScoreStats:
+        """
+        Получить распределение результатов тестирования
+
+        Результат кэшируется до появления новой попытки
+        или изменения тестирования
+
+        :param testing_id: id тестирования
+        :return:
+
+        """
+        stats = self._cache.get(f"testing_stats:{testing_id}")
+        if stats is not None:
+            return stats
+
+        testing = await self._repo.get(id=testing_id)
+        if not testing:
+            raise exceptions.NotFound(f"Тестирование с id:{testing_id} не найдено")
+
+        distribution = await self._attempt_repo.get_score_distribution(
+            test_id=testing_id,
+            correct_percent=testing.correct_percent,
+            graded_only=testing.type == TestType.PRACTICAL
+        )
+        stats = schemas.TestingScoreStats(
+            testing_id=testing_id,
+            correct_percent=testing.correct_percent,
+            pass_rate=distribution["passed"] / distribution["attempts"] if distribution["attempts"] else 0,
+            **distribution
+        )
+        # Инвалидации рассылаются другим воркерам; время жизни ограничивает
+        # устаревание, если шина инвалидации не настроена
+        self._cache.set(f"testing_stats:{testing_id}", stats, ttl=60)
+        return stats
+
+    @permission_filter(Permission.GET_USER_TEST_RESULTS)
+    @state_filter(UserState.ACTIVE)
+    async def get_attempt_rollups(
+            self,
+            bucket: RollupBucket = RollupBucket.DAY,
+            since: datetime = None,
+            until: datetime = None,
+            vacancy_id: uuid.UUID = None,
+            testing_id: uuid.UUID = None,
+            by_testing: bool = True,
+    ) -> list[schemas.AttemptRollup]:
+        """
+        Получить количество попыток, успешных попыток и средний процент
+        по часам или дням (для графиков)
+
+        :param bucket: размер интервала
+        :param since: начало периода (по умолчанию - 30 дней назад)
+        :param until: конец периода (по умолчанию - текущее время)
+        :param vacancy_id: id вакансии
+        :param testing_id: id тестирования
+        :param by_testing: разбивать ряд по тестированиям
+        :return:
+
+        """
+        until = until or datetime.now(timezone.utc)
+        since = since or until - timedelta(days=30)
+
+        # Время без часового пояса считаем UTC
+        until = until if until.tzinfo else until.replace(tzinfo=timezone.utc)
+        since = since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+
+        if since > until:
+            raise exceptions.BadRequest("Начало периода не может быть позже его конца")
+
+        max_period = timedelta(days=31) if bucket == RollupBucket.HOUR else timedelta(days=3 * 366)
+        if until - since > max_period:
+            raise exceptions.BadRequest(f"Период не может быть больше {max_period.days} дней")
+
+        series = await self._attempt_rollup_repo.get_series(
+            bucket=bucket,
+            since=since,
+            until=until,
+            vacancy_id=vacancy_id,
+            testing_id=testing_id,
+            by_testing=by_testing
+        )
+        return [schemas.AttemptRollup.model_validate(item) for item in series]
+
     @permission_filter(Permission.START_TESTING)
     @state_filter(UserState.ACTIVE)
     async def start_practical_testing(self, testing_id: uuid.UUID) -> list[schemas.PracticalQuestion]:
@@ -270,6 +391,16 @@ class TestingApplicationService:
                 test_id=testing_id,
             )
         )
+        await self._attempt_rollup_repo.increment(
+            testing_id=testing_id,
+            vacancy_id=testing.vacancy_id,
+            at=attempt.created_at,
+            attempts=1,
+            graded=1,
+            passed=int(user_percent >= testing.correct_percent),
+            percent_sum=user_percent
+        )
+        self._cache.delete(f"testing_stats:{testing_id}")
         return schemas.AttemptTest(**attempt.model_dump(exclude={"test"}), test=schemas.Testing.model_validate(testing))
 
     @permission_filter(Permission.COMPLETE_TESTING)
@@ -326,6 +457,13 @@ class TestingApplicationService:
                 test_id=testing_id,
             )
         )
+        await self._attempt_rollup_repo.increment(
+            testing_id=testing_id,
+            vacancy_id=testing.vacancy_id,
+            at=attempt.created_at,
+            attempts=1
+        )
+        self._cache.delete(f"testing_stats:{testing_id}")
 
         # Проверка ответов
         background_tasks.add_task(
@@ -335,7 +473,9 @@ class TestingApplicationService:
             self._db_lazy_session,
             self._http_client,
             self._config.judge0host,
-            attempt.id
+            attempt,
+            schemas.Testing.model_validate(testing),
+            self._cache
         )
 
         return schemas.AttemptTest(**attempt.model_dump(exclude={"test"}), test=schemas.Testing.model_validate(testing))
@@ -356,6 +496,10 @@ class TestingApplicationService:
             raise exceptions.NotFound(f"Вакансия с id:{vacancy_id} не найдена")
 
         testing = await self._repo.create(**data.model_dump(), vacancy_id=vacancy_id)
+        await self._vacancy_summary_repo.increment(vacancy_id, testings=1)
+        self._cache.delete(f"etag:testings:{vacancy_id}")
+        self._cache.delete(self.get_testings.cache_key(vacancy_id))
+        self._cache.delete_prefix("vacancy_list_payload:")
         return schemas.Testing.model_validate(testing)
 
     @permission_filter(Permission.UPDATE_TESTING)
@@ -381,6 +525,11 @@ class TestingApplicationService:
             raise exceptions.BadRequest(f"Вакансия с id:{testing.vacancy_id} не открыта")
 
         await self._repo.update(testing_id, **data.model_dump(exclude_unset=True))
+        self._cache.delete(f"testing_stats:{testing_id}")
+        self._cache.delete(f"etag:testing:{testing_id}")
+        self._cache.delete(f"etag:testings:{testing.vacancy_id}")
+        self._cache.delete(self.get_testing.cache_key(testing_id))
+        self._cache.delete(self.get_testings.cache_key(testing.vacancy_id))
         testing = await self._repo.get(id=testing_id)
         return schemas.Testing.model_validate(testing)
 
@@ -406,9 +555,19 @@ class TestingApplicationService:
             raise exceptions.BadRequest(f"Вакансия с id:{testing.vacancy_id} не открыта")
         # todo
         await self._repo.delete(id=testing_id)
+        await self._vacancy_summary_repo.increment(testing.vacancy_id, testings=-1)
+        self._cache.delete(f"testing_stats:{testing_id}")
+        self._cache.delete_prefix("vacancy_list_payload:")
+        self._cache.delete(f"etag:testing:{testing_id}")
+        self._cache.delete(f"etag:testings:{testing.vacancy_id}")
+        self._cache.delete(f"etag:practical_questions:{testing_id}")
+        self._cache.delete(f"etag:theoretical_questions:{testing_id}")
+        self._cache.delete(self.get_testing.cache_key(testing_id))
+        self._cache.delete(self.get_testings.cache_key(testing.vacancy_id))
 
     @permission_filter(Permission.GET_TESTING)
     @state_filter(UserState.ACTIVE)
+    @cached("service:testing", ttl=30, stale_ttl=60, negative_ttl=5)
     async def get_testing(self, testing_id: uuid.UUID) -> schemas.Testing:
         """
         Получить тестирование
@@ -432,6 +591,7 @@ class TestingApplicationService:
 
     @permission_filter(Permission.GET_TESTING)
     @state_filter(UserState.ACTIVE)
+    @cached("service:testings", ttl=30, stale_ttl=60)
     async def get_testings(self, vacancy_id: uuid.UUID, ) -> list[schemas.Testing]:
         """
         Получить список тестирований вакансии
@@ -444,6 +604,50 @@ class TestingApplicationService:
         testings = await self._repo.get_all(vacancy_id=vacancy_id)
         return [schemas.Testing.model_validate(testing) for testing in testings]
 
+    @permission_filter(Permission.GET_TESTING)
+    @state_filter(UserState.ACTIVE)
+    async def get_testing_payload(
+            self,
+            testing_id: uuid.UUID,
+            render: Callable[[schemas.Testing], bytes],
+            if_none_match: str = None
+    ) -> tuple[str, bytes | None]:
+        """
+        Получить сериализованное тестирование и его ETag
+
+        :param testing_id: id тестирования
+        :param render: сериализатор тестирования в тело ответа
+        :param if_none_match: значение заголовка If-None-Match
+        :return: (ETag, тело ответа или None, если у клиента актуальная версия)
+
+        """
+        async def load() -> bytes:
+            return render(await self.get_testing(testing_id))
+
+        return await conditional_payload(self._cache, f"etag:testing:{testing_id}", if_none_match, load)
+
+    @permission_filter(Permission.GET_TESTING)
+    @state_filter(UserState.ACTIVE)
+    async def get_testings_payload(
+            self,
+            vacancy_id: uuid.UUID,
+            render: Callable[[list[schemas.Testing]], bytes],
+            if_none_match: str = None
+    ) -> tuple[str, bytes | None]:
+        """
+        Получить сериализованный список тестирований вакансии и его ETag
+
+        :param vacancy_id: id вакансии
+        :param render: сериализатор списка в тело ответа
+        :param if_none_match: значение заголовка If-None-Match
+        :return: (ETag, тело ответа или None, если у клиента актуальная версия)
+
+        """
+        async def load() -> bytes:
+            return render(await self.get_testings(vacancy_id))
+
+        return await conditional_payload(self._cache, f"etag:testings:{vacancy_id}", if_none_match, load)
+
     @permission_filter(Permission.UPDATE_TESTING)
     @state_filter(UserState.ACTIVE)
     async def create_practical_question(
@@ -474,6 +678,7 @@ class TestingApplicationService:
             raise exceptions.BadRequest(f"Тестирование с id:{testing_id} не является практическим")
 
         question = await self._practical_question_repo.create(**data.model_dump(), testing_id=testing_id)
+        self._cache.delete(f"etag:practical_questions:{testing_id}")
         return schemas.PracticalQuestion.model_validate(question)
 
     @permission_filter(Permission.CREATE_TESTING)
@@ -506,6 +711,7 @@ class TestingApplicationService:
             raise exceptions.BadRequest(f"Тестирование с id:{testing_id} не является теоретическим")
 
         _ = await self._theoretical_question_repo.create(**data.model_dump(), testing_id=testing_id)
+        self._cache.delete(f"etag:theoretical_questions:{testing_id}")
         question = await self._theoretical_question_repo.get(id=_.id, as_full=True)
         return schemas.TheoreticalQuestion.model_validate(question)
 
@@ -529,6 +735,7 @@ class TestingApplicationService:
             raise exceptions.NotFound(f"Практический вопрос с id:{question_id} не найден")
 
         await self._practical_question_repo.update(question_id, **data.model_dump(exclude_unset=True))
+        self._cache.delete(f"etag:practical_questions:{question.testing_id}")
         question = await self._practical_question_repo.get(id=question_id)
         return schemas.PracticalQuestion.model_validate(question)
 
@@ -552,6 +759,7 @@ class TestingApplicationService:
             raise exceptions.NotFound(f"Теоретический вопрос с id:{question_id} не найден")
 
         await self._theoretical_question_repo.update(question_id, **data.model_dump(exclude_unset=True))
+        self._cache.delete(f"etag:theoretical_questions:{question.testing_id}")
         question = await self._theoretical_question_repo.get(id=question_id)
         return schemas.TheoreticalQuestion.model_validate(question)
 
@@ -570,6 +778,7 @@ class TestingApplicationService:
             raise exceptions.NotFound(f"Практический вопрос с id:{question_id} не найден")
 
         await self._practical_question_repo.delete(id=question_id)
+        self._cache.delete(f"etag:practical_questions:{question.testing_id}")
 
     @permission_filter(Permission.DELETE_TESTING)
     @state_filter(UserState.ACTIVE)
@@ -586,6 +795,7 @@ class TestingApplicationService:
             raise exceptions.NotFound(f"Теоретический вопрос с id:{question_id} не найден")
 
         await self._theoretical_question_repo.delete(id=question_id)
+        self._cache.delete(f"etag:theoretical_questions:{question.testing_id}")
 
     @permission_filter(Permission.UPDATE_TESTING)
     @state_filter(UserState.ACTIVE)
@@ -639,6 +849,7 @@ class TestingApplicationService:
             raise exceptions.NotFound(f"Теоретический вопрос с id:{question_id} не найден")
 
         await self._answer_option_repo.create(**data.model_dump(), question_id=question_id)
+        self._cache.delete(f"etag:theoretical_questions:{question.testing_id}")
         new_question = await self._theoretical_question_repo.get(id=question.id, as_full=True)
         return schemas.TheoreticalQuestion.model_validate(new_question)
 
@@ -668,6 +879,54 @@ class TestingApplicationService:
         questions = await self._theoretical_question_repo.get_all(testing_id=testing_id, as_full=True)
         return [schemas.TheoreticalQuestion.model_validate(question) for question in questions]
 
+    @permission_filter(Permission.UPDATE_TESTING)
+    @state_filter(UserState.ACTIVE)
+    async def get_practical_questions_payload(
+            self,
+            testing_id: uuid.UUID,
+            render: Callable[[list[schemas.PracticalQuestion]], bytes],
+            if_none_match: str = None
+    ) -> tuple[str, bytes | None]:
+        """
+        Получить сериализованный список практических вопросов и его ETag
+
+        :param testing_id: id тестирования
+        :param render: сериализатор списка в тело ответа
+        :param if_none_match: значение заголовка If-None-Match
+        :return: (ETag, тело ответа или None, если у клиента актуальная версия)
+
+        """
+        async def load() -> bytes:
+            return render(await self.get_practical_questions(testing_id))
+
+        return await conditional_payload(
+            self._cache, f"etag:practical_questions:{testing_id}", if_none_match, load
+        )
+
+    @permission_filter(Permission.UPDATE_TESTING)
+    @state_filter(UserState.ACTIVE)
+    async def get_theoretical_questions_payload(
+            self,
+            testing_id: uuid.UUID,
+            render: Callable[[list[schemas.TheoreticalQuestion]], bytes],
+            if_none_match: str = None
+    ) -> tuple[str, bytes | None]:
+        """
+        Получить сериализованный список теоретических вопросов и его ETag
+
+        :param testing_id: id тестирования
+        :param render: сериализатор списка в тело ответа
+        :param if_none_match: значение заголовка If-None-Match
+        :return: (ETag, тело ответа или None, если у клиента актуальная версия)
+
+        """
+        async def load() -> bytes:
+            return render(await self.get_theoretical_questions(testing_id))
+
+        return await conditional_payload(
+            self._cache, f"etag:theoretical_questions:{testing_id}", if_none_match, load
+        )
+
     @staticmethod
     async def __checking_practical_answers(
             questions: list[schemas.PracticalQuestion],
@@ -675,7 +934,9 @@ class TestingApplicationService:
             db_lazy_session,
             http_client: AiohttpClient,
             judge0host: str,
-            attempt_id: uuid.UUID
+            attempt: schemas.Attempt,
+            testing: schemas.Testing,
+            cache: MemoryCache
     ):
         # Hashing
         questions_hash = {}
@@ -724,8 +985,16 @@ class TestingApplicationService:
             user_percent = int((correct_answers * 100) / all_questions)
 
         async with db_lazy_session() as session:
-            attempt = AttemptRepo(session)
-            await attempt.update(attempt_id, percent=user_percent)
+            await AttemptRepo(session).update(attempt.id, percent=user_percent)
+            await AttemptRollupRepo(session).increment(
+                testing_id=testing.id,
+                vacancy_id=testing.vacancy_id,
+                at=attempt.created_at,
+                graded=1,
+                passed=int(user_percent >= testing.correct_percent),
+                percent_sum=user_percent
+            )
+        cache.delete(f"testing_stats:{testing.id}")
 
     @permission_filter(Permission.GET_TESTING)
     @state_filter(UserState.ACTIVE)
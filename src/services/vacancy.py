@@ -1,5 +1,8 @@
+import hashlib
+import json
 import uuid
-from typing import Literal
+from datetime import datetime, timedelta, timezone
+from typing import Literal, Callable
 
 from src import exceptions
 from src.models import schemas
@@ -8,8 +11,13 @@ from src.models.auth import BaseUser
 from src.models.state import VacancyState, UserState
 from src.services.auth.filters import state_filter
 from src.services.auth.filters import permission_filter
+from src.services.caching import cached
 from src.services.repository import FileRepo
 from src.services.repository import VacancyRepo
+from src.services.repository import VacancySummaryRepo
+from src.utils.cache import MemoryCache
+from src.utils.etag import make_etag, etag_matches
+from src.utils.pagination import Cursor, encode_cursor, decode_page_cursor, page_cursors
 from src.utils.s3 import S3Storage
 
 
@@ -19,14 +27,19 @@ class VacancyApplicationService:
             self,
             current_user: BaseUser,
             vacancy_repo: VacancyRepo,
+            vacancy_summary_repo: VacancySummaryRepo,
             file_repo: FileRepo,
-            file_storage: S3Storage
-
+            file_storage: S3Storage,
+            cache: MemoryCache,
+            db_lazy_session,
     ):
         self._current_user = current_user
         self._repo = vacancy_repo
+        self._summary_repo = vacancy_summary_repo
         self._file_repo = file_repo
         self._file_storage = file_storage
+        self._cache = cache
+        self._db_lazy_session = db_lazy_session
 
     async def get_vacancies(
             self,
@@ -34,16 +47,24 @@ class VacancyApplicationService:
             page: int = 1,
             per_page: int = 10,
             order_by: Literal["title", "updated_at", "created_at"] = "created_at",
-            query: str = None
-    ) -> list[schemas.VacancySmall]:
+            query: str = None,
+            search_mode: Literal["fulltext", "fuzzy"] = "fulltext",
+            cursor: str = None,
+    ) -> schemas.Page[schemas.VacancyListItem]:
         """
         Получить список вакансий
 
+        Без поискового запроса доступна курсорная пагинация: курсоры
+        next_cursor/prev_cursor ответа передаются в cursor вместо page
+        и не требуют OFFSET на стороне БД
+
         :param page: номер страницы (всегда >= 1)
         :param per_page: количество статей на странице (всегда >= 1, но <= per_page_limit)
         :param order_by: поле сортировки
         :param query: поисковый запрос (если необходим)
+        :param search_mode: режим поиска: полнотекстовый или по заголовку с учетом опечаток
         :param state: статус вакансии (по умолчанию только открытые)
+        :param cursor: курсор страницы (если указан, page игнорируется)
         :return:
 
         """
@@ -52,18 +73,10 @@ class VacancyApplicationService:
             raise exceptions.NotFound("Страница не найдена")
         if per_page < 1:
             raise exceptions.BadRequest("Неверное количество элементов на странице")
+        if query and cursor:
+            raise exceptions.BadRequest("Курсорная пагинация недоступна при поиске")
 
-        if (
-                state != VacancyState.OPENED and
-                Permission.GET_PRIVATE_VACANCY.value not in self._current_user.permissions
-        ):
-            raise exceptions.AccessDenied("Вы не можете получить список приватных вакансий")
-
-        if (
-                state == VacancyState.OPENED and
-                Permission.GET_PUBLIC_VACANCY.value not in self._current_user.permissions
-        ):
-            raise exceptions.AccessDenied("Вы не можете получить список публичных вакансий")
+        self._check_list_access(state)
 
         per_page_limit = 40
 
@@ -75,46 +88,331 @@ class VacancyApplicationService:
         if query:
             vacancies = await self._repo.search(
                 query=query,
-                fields=["title", "content"],
+                mode=search_mode,
                 limit=per_page,
                 offset=offset,
                 order_by=order_by,
+                columns=schemas.VacancySmall.model_fields.keys(),
+                with_summary=True,
                 **{"state": state} if state else {},
             )
+            return schemas.Page[schemas.VacancyListItem](items=self._list_items(vacancies))
+
+        position = None
+        if cursor:
+            try:
+                position = decode_page_cursor(cursor, order_by, ("created_at", "updated_at"))
+            except ValueError as error:
+                raise exceptions.BadRequest(str(error))
+
+        vacancies, has_more = await self._repo.get_page(
+            limit=per_page,
+            order_by=order_by,
+            offset=0 if position else offset,
+            after=(position.value, position.id) if position and position.direction == "next" else None,
+            before=(position.value, position.id) if position and position.direction == "prev" else None,
+            columns=schemas.VacancySmall.model_fields.keys(),
+            with_summary=True,
+            **{"state": state} if state else {},
+        )
+
+        next_cursor, prev_cursor = page_cursors(
+            vacancies,
+            order_by=order_by,
+            value_of=lambda vacancy: (
+                vacancy.updated_at or vacancy.created_at
+                if order_by == "updated_at" else getattr(vacancy, order_by)
+            ),
+            cursor=position,
+            has_more=has_more,
+            offset=offset,
+        )
+        return schemas.Page[schemas.VacancyListItem](
+            items=self._list_items(vacancies),
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
+        )
+
+    async def get_vacancies_payload(
+            self,
+            render: Callable[[schemas.Page[schemas.VacancyListItem]], bytes],
+            state: VacancyState,
+            page: int = 1,
+            per_page: int = 10,
+            order_by: Literal["title", "updated_at", "created_at"] = "created_at",
+            query: str = None,
+            search_mode: Literal["fulltext", "fuzzy"] = "fulltext",
+            cursor: str = None,
+    ) -> bytes:
+        """
+        Получить сериализованный список вакансий
+
+        Ответы для открытых вакансий одинаковы для всех пользователей,
+        поэтому кэшируются в сериализованном виде до изменения любой вакансии
+
+        :param render: сериализатор страницы в тело ответа
+        :return:
+
+        """
+        params = dict(
+            state=state,
+            page=page,
+            per_page=per_page,
+            order_by=order_by,
+            query=query,
+            search_mode=search_mode,
+            cursor=cursor,
+        )
+
+        if state != VacancyState.OPENED:
+            return render(await self.get_vacancies(**params))
+
+        # Права и курсор проверяются до обращения к кэшу
+        self._check_list_access(state)
+        if cursor:
+            try:
+                decode_page_cursor(cursor, order_by, ("created_at", "updated_at"))
+            except ValueError as error:
+                raise exceptions.BadRequest(str(error))
+
+        # Поисковый запрос может содержать любые символы, поэтому ключ - хэш параметров
+        key = "vacancy_list_payload:" + hashlib.blake2b(
+            json.dumps(params, sort_keys=True, default=str).encode("utf-8"),
+            digest_size=16
+        ).hexdigest()
+        payload = self._cache.get(key)
+        if payload is None:
+            payload = render(await self.get_vacancies(**params))
+            # Инвалидации рассылаются другим воркерам; время жизни ограничивает
+            # устаревание, если шина инвалидации не настроена
+            self._cache.set(key, payload, ttl=30)
+        return payload
+
+    async def get_changes(
+            self,
+            since: datetime = None,
+            cursor: str = None,
+            limit: int = 100
+    ) -> schemas.VacancyChanges:
+        """
+        Получить вакансии, созданные, измененные или удаленные с момента синхронизации
+
+        next_cursor возвращается всегда: клиент сохраняет его и продолжает
+        с него следующую синхронизацию. Без права GET_PRIVATE_VACANCY
+        возвращаются только открытые вакансии, а открытые вакансии, которые
+        были удалены или закрыты, - как удаленные: id закрытых вакансий
+        не раскрываются
+
+        :param since: время последней синхронизации (если нет курсора)
+        :param cursor: курсор предыдущего ответа
+        :param limit: количество изменений в ответе (всегда >= 1, но <= limit_max)
+        :return:
+
+        """
+        if (
+                not self._current_user.has_permission(Permission.GET_PRIVATE_VACANCY) and
+                not self._current_user.has_permission(Permission.GET_PUBLIC_VACANCY)
+        ):
+            raise exceptions.AccessDenied("Вы не можете получить изменения вакансий")
+
+        if limit < 1:
+            raise exceptions.BadRequest("Неверное количество элементов")
+        limit = min(limit, 500)
+
+        if cursor:
+            try:
+                position = decode_page_cursor(cursor, "changed_at", ("changed_at",))
+            except ValueError as error:
+                raise exceptions.BadRequest(str(error))
+        elif since:
+            since = since if since.tzinfo else since.replace(tzinfo=timezone.utc)
+            position = Cursor("changed_at", since, uuid.UUID(int=0))
         else:
-            vacancies = await self._repo.get_all(
-                limit=per_page,
-                offset=offset,
-                order_by=order_by,
-                **{"state": state} if state else {},
+            raise exceptions.BadRequest("Необходимо указать since или cursor")
+
+        private = self._current_user.has_permission(Permission.GET_PRIVATE_VACANCY)
+
+        # Изменения последних секунд могут принадлежать еще не завершенным транзакциям
+        until = datetime.now(timezone.utc) - timedelta(seconds=5)
+        changes = await self._repo.get_changes(
+            after=(position.value, position.id),
+            until=until,
+            limit=limit + 1,
+            state=None if private else VacancyState.OPENED
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        vacancies = {
+            vacancy.id: vacancy
+            for vacancy in await self._repo.get_by_ids(
+                [change.id for change in changes],
+                columns=schemas.VacancySmall.model_fields.keys()
             )
-        return [schemas.VacancySmall.model_validate(vacancy) for vacancy in vacancies]
+        }
+
+        changed, deleted = [], []
+        for change in changes:
+            vacancy = vacancies.get(change.id)
+            if change.deleted:
+                # Отметка о закрытии: с правом GET_PRIVATE_VACANCY вакансия не удалена
+                if not (private and vacancy):
+                    deleted.append(change.id)
+                continue
+            # Вакансия, удаленная или закрытая после выборки, попадет
+            # в следующую синхронизацию по отметке об удалении
+            if vacancy and (private or vacancy.state == VacancyState.OPENED):
+                changed.append(schemas.VacancySmall.model_validate(vacancy))
+
+        if changes:
+            position = Cursor("changed_at", changes[-1].changed_at, changes[-1].id)
+        return schemas.VacancyChanges(
+            changed=changed,
+            deleted=deleted,
+            next_cursor=encode_cursor(position),
+            has_more=has_more,
+        )
+
+    async def get_title_suggestion(self, state: VacancyState, query: str) -> str | None:
+        """
+        Получить наиболее похожий на запрос заголовок вакансии ("возможно, вы имели в виду")
+
+        :param state: статус вакансии
+        :param query: поисковый запрос
+        :return:
+
+        """
+        self._check_list_access(state)
+
+        if not query or len(query) > 255:
+            raise exceptions.BadRequest("Неверный поисковый запрос")
+
+        return await self._repo.suggest_title(query, state=state)
+
+    async def get_title_completions(
+            self,
+            state: VacancyState,
+            query: str,
+            limit: int = 10
+    ) -> list[schemas.VacancyTitle]:
+        """
+        Получить подсказки заголовков вакансий для поисковой строки
+
+        :param state: статус вакансий
+        :param query: введенная часть заголовка
+        :param limit: количество подсказок (всегда >= 1, но <= 20)
+        :return:
+
+        """
+        self._check_list_access(state)
+
+        if not query or len(query) > 255:
+            raise exceptions.BadRequest("Неверный поисковый запрос")
+        if limit < 1:
+            raise exceptions.BadRequest("Неверное количество подсказок")
+
+        completions = await self._repo.autocomplete_titles(query, state=state, limit=min(limit, 20))
+        return [schemas.VacancyTitle(id=vacancy_id, title=title) for vacancy_id, title in completions]
 
     async def get_vacancy(self, vacancy_id: uuid.UUID) -> schemas.Vacancy:
-        vacancy = await self._repo.get(id=vacancy_id)
-        if not vacancy:
-            raise exceptions.NotFound("Вакансия не найдена")
+        vacancy = await self._get_vacancy(vacancy_id)
 
         if (
                 vacancy.state != VacancyState.OPENED and
-                Permission.GET_PRIVATE_VACANCY.value not in self._current_user.permissions
+                not self._current_user.has_permission(Permission.GET_PRIVATE_VACANCY)
         ):
             raise exceptions.AccessDenied("Вакансия не найдена")
 
         if (
                 vacancy.state == VacancyState.OPENED and
-                Permission.GET_PUBLIC_VACANCY.value not in self._current_user.permissions
+                not self._current_user.has_permission(Permission.GET_PUBLIC_VACANCY)
         ):
             raise exceptions.AccessDenied("Вы не можете получить публичную вакансию")
 
+        return vacancy
+
+    @cached("service:vacancy", ttl=30, stale_ttl=60, negative_ttl=5)
+    async def _get_vacancy(self, vacancy_id: uuid.UUID) -> schemas.Vacancy:
+        vacancy = await self._repo.get(id=vacancy_id)
+        if not vacancy:
+            raise exceptions.NotFound("Вакансия не найдена")
         return schemas.Vacancy.model_validate(vacancy)
 
+    async def get_vacancies_by_ids(self, vacancy_ids: list[uuid.UUID]) -> schemas.VacancyBatch:
+        """
+        Получить вакансии по списку id одним запросом
+
+        Права проверяются для каждой вакансии: недоступные и несуществующие
+        вакансии возвращаются в missing
+
+        :param vacancy_ids: id вакансий (не более 100)
+        :return: вакансии в порядке запроса
+
+        """
+        vacancy_ids = list(dict.fromkeys(vacancy_ids))
+        if not vacancy_ids:
+            raise exceptions.BadRequest("Не указаны id вакансий")
+        if len(vacancy_ids) > 100:
+            raise exceptions.BadRequest("Нельзя получить более 100 вакансий за запрос")
+
+        vacancies = {vacancy.id: vacancy for vacancy in await self._repo.get_by_ids(vacancy_ids)}
+
+        items, missing = [], []
+        for vacancy_id in vacancy_ids:
+            vacancy = vacancies.get(vacancy_id)
+            if vacancy and (
+                    self._current_user.has_permission(Permission.GET_PUBLIC_VACANCY)
+                    if vacancy.state == VacancyState.OPENED else
+                    self._current_user.has_permission(Permission.GET_PRIVATE_VACANCY)
+            ):
+                items.append(schemas.Vacancy.model_validate(vacancy))
+            else:
+                missing.append(vacancy_id)
+        return schemas.VacancyBatch(items=items, missing=missing)
+
+    async def get_vacancy_payload(
+            self,
+            vacancy_id: uuid.UUID,
+            render: Callable[[schemas.Vacancy], bytes],
+            if_none_match: str = None
+    ) -> tuple[str, bytes | None]:
+        """
+        Получить сериализованную вакансию и ее ETag
+
+        Открытые вакансии кэшируются в сериализованном виде до их изменения
+
+        :param vacancy_id: id вакансии
+        :param render: сериализатор вакансии в тело ответа
+        :param if_none_match: значение заголовка If-None-Match
+        :return: (ETag, тело ответа или None, если у клиента актуальная версия)
+
+        """
+        key = f"vacancy_payload:{vacancy_id}"
+        cached = self._cache.get(key)
+        if cached is not None:
+            # Права проверяются до отдачи кэша (в кэше только открытые вакансии)
+            if not self._current_user.has_permission(Permission.GET_PUBLIC_VACANCY):
+                raise exceptions.AccessDenied("Вы не можете получить публичную вакансию")
+            etag, payload = cached
+        else:
+            vacancy = await self.get_vacancy(vacancy_id)
+            payload = render(vacancy)
+            etag = make_etag(payload)
+            if vacancy.state == VacancyState.OPENED:
+                self._cache.set(key, (etag, payload), ttl=30)
+
+        if etag_matches(if_none_match, etag):
+            return etag, None
+        return etag, payload
+
     @permission_filter(Permission.CREATE_VACANCY)
     @state_filter(UserState.ACTIVE)
     async def create_vacancy(self, data: schemas.VacancyCreate) -> schemas.Vacancy:
         vacancy = await self._repo.create(
             **data.model_dump()
         )
+        await self._summary_repo.increment(vacancy.id)
+        self._invalidate_payloads(vacancy.id)
         return schemas.Vacancy.model_validate(vacancy)
 
     @permission_filter(Permission.UPDATE_VACANCY)
@@ -124,7 +422,14 @@ class VacancyApplicationService:
         if not vacancy:
             raise exceptions.NotFound("Вакансия не найдена")
 
-        await self._repo.update(vacancy_id, **data.model_dump(exclude_unset=True))
+        fields = data.model_dump(exclude_unset=True)
+        was_opened = vacancy.state == VacancyState.OPENED
+        if "state" in fields and was_opened != (fields["state"] == VacancyState.OPENED):
+            # Закрытая вакансия передается в vacancy/changes как удаленная
+            await self._repo.set_hidden(vacancy_id, hidden=was_opened)
+
+        await self._repo.update(vacancy_id, **fields)
+        self._invalidate_payloads(vacancy_id)
 
     @permission_filter(Permission.DELETE_VACANCY)
     @state_filter(UserState.ACTIVE)
@@ -134,6 +439,7 @@ class VacancyApplicationService:
             raise exceptions.NotFound("Вакансия не найдена")
         # todo
         await self._repo.delete(id=vacancy_id)
+        self._invalidate_payloads(vacancy_id)
 
     @permission_filter(Permission.UPDATE_VACANCY)
     @state_filter(UserState.ACTIVE)
@@ -172,13 +478,13 @@ class VacancyApplicationService:
 
         if (
                 vacancy.state != VacancyState.OPENED and
-                Permission.GET_PRIVATE_VACANCY.value not in self._current_user.permissions
+                not self._current_user.has_permission(Permission.GET_PRIVATE_VACANCY)
         ):
             raise exceptions.AccessDenied("Вы не можете просматривать файлы закрытых вакансий")
 
         if (
                 vacancy.state == VacancyState.OPENED and
-                Permission.GET_PUBLIC_VACANCY.value not in self._current_user.permissions
+                not self._current_user.has_permission(Permission.GET_PUBLIC_VACANCY)
         ):
             raise exceptions.AccessDenied("Вы не можете просматривать файлы публичных вакансий")
 
@@ -260,6 +566,8 @@ class VacancyApplicationService:
             raise exceptions.NotFound("Файл не загружен")
 
         await self._file_repo.update(id=file_id, is_uploaded=True)
+        await self._summary_repo.increment(vacancy_id, files=1)
+        self._cache.delete_prefix("vacancy_list_payload:")
 
     @permission_filter(Permission.UPDATE_VACANCY)
     @state_filter(UserState.ACTIVE)
@@ -280,9 +588,12 @@ class VacancyApplicationService:
 
         if vacancy.poster == file_id:
             await self._repo.update(id=vacancy_id, poster=None)
+            await self._summary_repo.set_poster(vacancy_id, None)
 
         await self._file_storage.delete(file_path=f"{vacancy_id}/{file_id}")
         await self._file_repo.delete(id=file_id)
+        await self._summary_repo.increment(vacancy_id, files=-1)
+        self._invalidate_payloads(vacancy_id)
 
     @permission_filter(Permission.UPDATE_VACANCY)
     @state_filter(UserState.ACTIVE)
@@ -305,3 +616,46 @@ class VacancyApplicationService:
             raise exceptions.BadRequest("Этот файл уже является постером статьи")
 
         await self._repo.update(id=vacancy_id, poster=file_id)
+        await self._summary_repo.set_poster(vacancy_id, file)
+        self._invalidate_payloads(vacancy_id)
+
+    def _list_items(self, vacancies: list) -> list[schemas.VacancyListItem]:
+        # Постер и счетчики берутся из сводки, загруженной вместе со списком
+        items = []
+        for vacancy in vacancies:
+            item = schemas.VacancyListItem.model_validate(vacancy)
+            summary = vacancy.summary
+            if summary:
+                item.testing_count = summary.testing_count
+                item.file_count = summary.file_count
+            if summary and summary.poster_id:
+                item.poster_url = self._file_storage.generate_download_public_url(
+                    file_path=f"{vacancy.id}/{summary.poster_id}",
+                    content_type=summary.poster_content_type,
+                    rcd="inline",
+                    filename=summary.poster_filename
+                )
+                item.poster_content_type = summary.poster_content_type
+            items.append(item)
+        return items
+
+    def _invalidate_payloads(self, vacancy_id: uuid.UUID) -> None:
+        self._cache.delete(f"vacancy_payload:{vacancy_id}")
+        self._cache.delete(self._get_vacancy.cache_key(vacancy_id))
+        self._cache.delete_prefix("vacancy_list_payload:")
+        # Доступность тестирований зависит от статуса вакансии
+        self._cache.delete_prefix("etag:testing:")
+        self._cache.delete_prefix("service:testing:")
+
+    def _check_list_access(self, state: VacancyState) -> None:
+        if (
+                state != VacancyState.OPENED and
+                not self._current_user.has_permission(Permission.GET_PRIVATE_VACANCY)
+        ):
+            raise exceptions.AccessDenied("Вы не можете получить список приватных вакансий")
+
+        if (
+                state == VacancyState.OPENED and
+                not self._current_user.has_permission(Permission.GET_PUBLIC_VACANCY)
+        ):
+            raise exceptions.AccessDenied("Вы не можете получить список публичных вакансий")
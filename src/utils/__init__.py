@@ -1,3 +1,4 @@
 from .openapi import custom_openapi
 from . import formators
 from . import validators
+from .cache import MemoryCache
@@ -0,0 +1,71 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable
+
+
+class MemoryCache:
+    """
+    Внутрипроцессный LRU-кэш с необязательным временем жизни записей
+
+    Ключи - строки вида "<namespace>:<id>", что позволяет
+    инвалидировать сразу группу записей по префиксу.
+
+    Инвалидации (delete, delete_prefix, clear) передаются издателю,
+    если он установлен (например, шине инвалидации между воркерами).
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None):
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._data: OrderedDict[str, tuple[Any, float | None]] = OrderedDict()
+        self._publisher: Callable[[str, str], None] | None = None
+
+    def set_publisher(self, publisher: Callable[[str, str], None] | None) -> None:
+        """
+        Устанавливает издателя инвалидаций
+
+        :param publisher: функция (операция, ключ или префикс)
+        :return:
+        """
+        self._publisher = publisher
+
+    def get(self, key: str, default: Any = None) -> Any:
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        value, expires_at = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        ttl = ttl if ttl is not None else self._ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self._maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: str, broadcast: bool = True) -> None:
+        self._data.pop(key, None)
+        if broadcast and self._publisher:
+            self._publisher("delete", key)
+
+    def delete_prefix(self, prefix: str, broadcast: bool = True) -> None:
+        for key in [key for key in self._data if key.startswith(prefix)]:
+            del self._data[key]
+        if broadcast and self._publisher:
+            self._publisher("delete_prefix", prefix)
+
+    def clear(self, broadcast: bool = True) -> None:
+        self._data.clear()
+        if broadcast and self._publisher:
+            self._publisher("clear", "")
+
+    def __len__(self) -> int:
+        return len(self._data)
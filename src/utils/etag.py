@@ -0,0 +1,77 @@
+import hashlib
+from typing import Awaitable, Callable
+
+from fastapi import status as http_status
+from fastapi.responses import Response
+
+from .cache import MemoryCache
+
+
+def make_etag(payload: bytes) -> str:
+    """
+    Строгий ETag по содержимому тела ответа
+
+    :param payload: тело ответа
+    :return:
+    """
+    return f'"{hashlib.blake2b(payload, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    Проверяет заголовок If-None-Match (слабое сравнение, RFC 9110 13.1.2)
+
+    :param if_none_match: значение заголовка
+    :param etag: текущий ETag ресурса
+    :return:
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+async def conditional_payload(
+        cache: MemoryCache,
+        key: str,
+        if_none_match: str | None,
+        load: Callable[[], Awaitable[bytes]],
+        ttl: float = 30
+) -> tuple[str, bytes | None]:
+    """
+    Условное получение тела ответа
+
+    ETag ресурса кэшируется под ключом key: если он совпадает с If-None-Match,
+    тело не загружается из БД и не сериализуется
+
+    :param cache: кэш валидаторов
+    :param key: ключ валидатора ("etag:<namespace>:<id>")
+    :param if_none_match: значение заголовка If-None-Match
+    :param load: загрузка и сериализация тела ответа
+    :param ttl: время жизни валидатора
+    :return: (ETag, тело ответа или None, если у клиента актуальная версия)
+    """
+    etag = cache.get(key)
+    if etag is not None and etag_matches(if_none_match, etag):
+        return etag, None
+
+    payload = await load()
+    etag = make_etag(payload)
+    cache.set(key, etag, ttl=ttl)
+    if etag_matches(if_none_match, etag):
+        return etag, None
+    return etag, payload
+
+
+def conditional_response(etag: str, payload: bytes | None) -> Response:
+    """
+    Ответ 200 с телом или 304 Not Modified
+
+    :param etag:
+    :param payload: тело ответа (None - 304)
+    :return:
+    """
+    if payload is None:
+        return Response(status_code=http_status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=payload, media_type="application/json", headers={"ETag": etag})
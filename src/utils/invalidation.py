@@ -0,0 +1,196 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Awaitable, Callable
+
+import asyncpg
+
+from .cache import MemoryCache
+
+
+class InvalidationBus:
+    """
+    Шина инвалидации кэша между воркерами через Postgres LISTEN/NOTIFY
+
+    Инвалидации локального кэша (delete, delete_prefix, clear) публикуются
+    в канал NOTIFY, а каждый воркер слушает канал и применяет чужие
+    инвалидации к своему кэшу. Пока соединение прослушивания потеряно,
+    события могли быть пропущены, поэтому при переподключении кэш очищается.
+    Неотправленные инвалидации этого воркера отправляются после переподключения.
+    """
+
+    # Ограничение Postgres на размер payload NOTIFY - 8000 байт
+    MAX_PAYLOAD = 7000
+
+    def __init__(self, cache: MemoryCache, channel: str = "cache_invalidation"):
+        self._cache = cache
+        self._channel = channel
+        self._origin = uuid.uuid4().hex
+        self._connect_kwargs: dict = {}
+
+        self._connection: asyncpg.Connection | None = None
+        self._queue: asyncio.Queue[tuple[str, str]] = asyncio.Queue()
+        self._lost = asyncio.Event()
+        self._connected = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+        self._handlers: list[tuple[str, Callable[[str], Awaitable[None]]]] = []
+        self._reset_handlers: list[Callable[[], Awaitable[None]]] = []
+        self._handler_tasks: set[asyncio.Task] = set()
+
+    async def start(self, **connect_kwargs) -> None:
+        """
+        Подключается к Postgres и начинает слушать канал
+
+        :param connect_kwargs: параметры asyncpg.connect
+        :return:
+        """
+        self._connect_kwargs = connect_kwargs
+        await self._connect()
+        self._cache.set_publisher(self.publish)
+        self._tasks = [
+            asyncio.create_task(self._send_loop()),
+            asyncio.create_task(self._reconnect_loop()),
+        ]
+
+    async def stop(self) -> None:
+        self._cache.set_publisher(None)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+
+    def publish(self, operation: str, key: str) -> None:
+        """
+        Ставит инвалидацию в очередь на отправку другим воркерам
+
+        :param operation: delete, delete_prefix или clear
+        :param key: ключ или префикс
+        :return:
+        """
+        self._queue.put_nowait((operation, key))
+
+    def on_invalidate(self, prefix: str, handler: Callable[[str], Awaitable[None]]) -> None:
+        """
+        Регистрирует обработчик инвалидаций других воркеров
+
+        :param prefix: префикс ключей, например "vacancy_payload:"
+        :param handler: вызывается с оставшейся после префикса частью ключа
+        :return:
+        """
+        self._handlers.append((prefix, handler))
+
+    def on_reset(self, handler: Callable[[], Awaitable[None]]) -> None:
+        """
+        Регистрирует обработчик переподключения (события могли быть пропущены)
+
+        :param handler:
+        :return:
+        """
+        self._reset_handlers.append(handler)
+
+    async def _connect(self) -> None:
+        self._lost.clear()
+        self._connection = await asyncpg.connect(**self._connect_kwargs)
+        self._connection.add_termination_listener(lambda connection: self._set_lost())
+        await self._connection.add_listener(self._channel, self._on_notification)
+        self._connected.set()
+
+    def _set_lost(self) -> None:
+        self._connected.clear()
+        self._lost.set()
+
+    async def _send_loop(self) -> None:
+        while True:
+            operations = [await self._queue.get()]
+            while not self._queue.empty():
+                operations.append(self._queue.get_nowait())
+
+            payloads = self._payloads(list(dict.fromkeys(operations)))
+            while payloads:
+                await self._connected.wait()
+                try:
+                    await self._connection.execute("SELECT pg_notify($1, $2)", self._channel, payloads[0])
+                except (asyncpg.PostgresError, OSError, asyncpg.InterfaceError) as error:
+                    # Соединения других воркеров не прерывались, и без повторной
+                    # отправки они продолжили бы отдавать устаревшие записи
+                    logging.warning(f"Не удалось отправить инвалидацию кэша, повтор после переподключения: {error}")
+                    self._set_lost()
+                    continue
+                payloads.pop(0)
+
+    async def _reconnect_loop(self) -> None:
+        delay = 1
+        while True:
+            await self._lost.wait()
+            logging.warning("Соединение шины инвалидации кэша потеряно, переподключение")
+            try:
+                if not self._connection.is_closed():
+                    await self._connection.close()
+                await self._connect()
+            except (asyncpg.PostgresError, OSError, asyncpg.InterfaceError) as error:
+                logging.warning(f"Не удалось подключить шину инвалидации кэша: {error}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+                continue
+
+            delay = 1
+            self._cache.clear(broadcast=False)
+            for handler in self._reset_handlers:
+                try:
+                    await handler()
+                except Exception as error:
+                    logging.error(f"Ошибка обработчика переподключения шины инвалидации: {error!r}")
+
+    def _payloads(self, operations: list[tuple[str, str]]) -> list[str]:
+        payloads, batch = [], []
+        for operation in operations:
+            if len(self._encode([operation]).encode("utf-8")) > self.MAX_PAYLOAD:
+                operation = ("clear", "")
+            if batch and len(self._encode(batch + [operation]).encode("utf-8")) > self.MAX_PAYLOAD:
+                payloads.append(self._encode(batch))
+                batch = []
+            batch.append(operation)
+        if batch:
+            payloads.append(self._encode(batch))
+        return payloads
+
+    def _encode(self, operations: list[tuple[str, str]]) -> str:
+        return json.dumps({"origin": self._origin, "ops": operations}, ensure_ascii=False)
+
+    def _on_notification(self, connection, pid: int, channel: str, payload: str) -> None:
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logging.warning(f"Неверное событие инвалидации кэша: {payload[:100]}")
+            return
+
+        if event.get("origin") == self._origin:
+            return
+
+        for operation, key in event.get("ops", []):
+            if operation == "delete":
+                self._cache.delete(key, broadcast=False)
+            elif operation == "delete_prefix":
+                self._cache.delete_prefix(key, broadcast=False)
+            elif operation == "clear":
+                self._cache.clear(broadcast=False)
+                # Индексы в памяти не привязаны к ключам кэша - перестраиваются полностью
+                for handler in self._reset_handlers:
+                    self._run_handler(handler())
+
+            for prefix, handler in self._handlers:
+                if operation == "delete" and key.startswith(prefix):
+                    self._run_handler(handler(key[len(prefix):]))
+
+    def _run_handler(self, coroutine: Awaitable[None]) -> None:
+        task = asyncio.create_task(coroutine)
+        self._handler_tasks.add(task)
+        task.add_done_callback(self._handler_done)
+
+    def _handler_done(self, task: asyncio.Task) -> None:
+        self._handler_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logging.error(f"Ошибка обработчика инвалидации кэша: {task.exception()!r}")
@@ -0,0 +1,114 @@
+import base64
+import binascii
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Literal
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """
+    Позиция в упорядоченной по (order_by, id) выборке
+
+    direction:
+    * next - строки после позиции
+    * prev - строки перед позицией
+    """
+    order_by: str
+    value: Any
+    id: uuid.UUID
+    direction: Literal["next", "prev"] = "next"
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    """
+    Кодирует курсор в непрозрачную для клиента строку
+
+    :param cursor:
+    :return:
+    """
+    value = cursor.value.isoformat() if isinstance(cursor.value, datetime) else cursor.value
+    raw = json.dumps(
+        [cursor.order_by, value, str(cursor.id), cursor.direction],
+        ensure_ascii=False,
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(token: str, datetime_fields: tuple[str, ...]) -> Cursor:
+    """
+    Декодирует курсор
+
+    :param token: строка курсора
+    :param datetime_fields: поля сортировки, значения которых являются датой
+        (значения остальных полей - строки)
+    :return:
+    :raises ValueError: если курсор поврежден
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        order_by, value, id_, direction = json.loads(raw)
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        if not isinstance(order_by, str) or not isinstance(id_, str):
+            raise ValueError(order_by)
+        # Значение попадает в сравнение с колонкой сортировки - тип проверяется до запроса к БД
+        if order_by in datetime_fields:
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, str):
+            raise ValueError(value)
+        return Cursor(order_by=order_by, value=value, id=uuid.UUID(id_), direction=direction)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as error:
+        raise ValueError("Неверный курсор") from error
+
+
+def decode_page_cursor(token: str, order_by: str, datetime_fields: tuple[str, ...]) -> Cursor:
+    """
+    Декодирует курсор и проверяет, что он получен для той же сортировки
+
+    :param token: строка курсора
+    :param order_by: текущее поле сортировки
+    :param datetime_fields: поля сортировки, значения которых являются датой
+    :return:
+    :raises ValueError: если курсор поврежден или получен для другой сортировки
+    """
+    cursor = decode_cursor(token, datetime_fields)
+    if cursor.order_by != order_by:
+        raise ValueError("Курсор получен для другой сортировки")
+    return cursor
+
+
+def page_cursors(
+        records: list,
+        order_by: str,
+        value_of: Callable[[Any], Any],
+        cursor: Cursor | None,
+        has_more: bool,
+        offset: int = 0,
+) -> tuple[str | None, str | None]:
+    """
+    Строит курсоры на следующую и предыдущую страницы
+
+    :param records: записи текущей страницы в порядке сортировки
+    :param order_by: поле сортировки
+    :param value_of: функция получения значения order_by записи
+    :param cursor: курсор, по которому получена страница (None - первая страница или OFFSET)
+    :param has_more: есть ли записи дальше по направлению обхода
+    :param offset: смещение страницы (при пагинации без курсора)
+    :return: (next_cursor, prev_cursor)
+    """
+    if not records:
+        return None, None
+
+    if cursor is None or cursor.direction == "next":
+        has_next, has_prev = has_more, cursor is not None or offset > 0
+    else:
+        has_next, has_prev = True, has_more
+
+    first, last = records[0], records[-1]
+    next_cursor = encode_cursor(Cursor(order_by, value_of(last), last.id, "next")) if has_next else None
+    prev_cursor = encode_cursor(Cursor(order_by, value_of(first), first.id, "prev")) if has_prev else None
+    return next_cursor, prev_cursor
@@ -0,0 +1,34 @@
+from fastapi import FastAPI
+from fastapi.routing import APIRoute
+
+
+def public_route(endpoint):
+    """
+    Отмечает маршрут как публичный (служебный): middleware авторизации
+    не разбирает для него куки и не проверяет JWT
+
+    Маршрут должен иметь постоянный путь и не использовать текущего пользователя
+
+    :param endpoint: обработчик маршрута
+    :return:
+    """
+    endpoint.__public_route__ = True
+    return endpoint
+
+
+def get_public_paths(app: FastAPI) -> frozenset[str]:
+    """
+    Пути публичных маршрутов и документации приложения
+
+    :param app:
+    :return:
+    """
+    paths = {
+        route.path
+        for route in app.routes
+        if isinstance(route, APIRoute) and getattr(route.endpoint, "__public_route__", False)
+    }
+    paths.update(
+        path for path in (app.openapi_url, app.docs_url, app.redoc_url, app.swagger_ui_oauth2_redirect_url) if path
+    )
+    return frozenset(paths)
@@ -0,0 +1,282 @@
+import fcntl
+import glob
+import hashlib
+import mmap
+import os
+import pickle
+import struct
+import time
+import zlib
+from typing import Any, Callable
+
+
+class SharedMemoryCache:
+    """
+    Кэш в разделяемой памяти (/dev/shm), общий для всех воркеров хоста
+
+    Сегмент фиксированного размера разбит на ячейки одинакового размера,
+    сгруппированные в корзины по WAYS ячеек. Ключ попадает в корзину
+    по хэшу; при нехватке места вытесняется самая старая запись корзины.
+    Значения хранятся сериализованными (pickle, zlib для крупных),
+    значения больше ячейки не кэшируются.
+
+    Чтение не берет блокировок (seqlock: четный счетчик версии ячейки
+    до и после копирования), запись блокирует диапазон корзины через fcntl.
+
+    Версия приложения и геометрия сегмента входят в имя файла, поэтому
+    сегмент, отображенный в память, никогда не усекается: воркеры другой
+    версии (например, при поэтапном перезапуске) работают со своим файлом,
+    а неиспользуемые сегменты удаляются.
+
+    Интерфейс совпадает с MemoryCache.
+    """
+
+    MAGIC = b"VSHMCACHE1"
+    WAYS = 4
+    COMPRESS_FROM = 512
+    READ_RETRIES = 8
+
+    # Заголовок сегмента: magic, размер ячейки, количество ячеек, версия приложения
+    SEGMENT_HEADER = struct.Struct("<10sII32s")
+    # Заголовок ячейки: seq, expires_at, written_at, длина значения, длина ключа, флаги, хэш ключа
+    SLOT_HEADER = struct.Struct("<QddIHB16sx")
+    SEQ = struct.Struct("<Q")
+
+    FLAG_COMPRESSED = 1
+
+    def __init__(
+            self,
+            path: str = "/dev/shm/vacancy-service-cache",
+            size: int = 32 * 1024 * 1024,
+            slot_size: int = 16 * 1024,
+            ttl: float | None = None,
+            version: str = "",
+    ):
+        self._slot_size = slot_size
+        self._ttl = ttl
+        self._buckets = max(size // slot_size // self.WAYS, 1)
+        self._slots = self._buckets * self.WAYS
+        self._data_offset = mmap.PAGESIZE
+        self._length = self._data_offset + self._slots * self._slot_size
+        self._publisher: Callable[[str, str], None] | None = None
+
+        header = self.SEGMENT_HEADER.pack(self.MAGIC, self._slot_size, self._slots, version.encode()[:32])
+        self._path = f"{path}.{hashlib.blake2b(header, digest_size=8).hexdigest()}"
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+        # Разделяемая flock - признак того, что сегмент используется (не пересекается с lockf записи)
+        fcntl.flock(self._fd, fcntl.LOCK_SH)
+        fcntl.lockf(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.pread(self._fd, len(header), 0) != header:
+                # Новый сегмент: файл с этим именем создается только с такой геометрией
+                if os.fstat(self._fd).st_size < self._length:
+                    os.ftruncate(self._fd, self._length)
+                os.pwrite(self._fd, header, 0)
+            self._mm = mmap.mmap(self._fd, self._length)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN)
+        self._remove_unused(path)
+
+    def set_publisher(self, publisher: Callable[[str, str], None] | None) -> None:
+        """
+        Устанавливает издателя инвалидаций
+
+        :param publisher: функция (операция, ключ или префикс)
+        :return:
+        """
+        self._publisher = publisher
+
+    def get(self, key: str, default: Any = None) -> Any:
+        key_bytes = key.encode("utf-8")
+        key_hash = self._hash(key_bytes)
+        for slot in self._bucket_slots(key_hash):
+            item = self._read(slot)
+            if item is None or item[1] != key_bytes:
+                continue
+
+            expires_at, _, flags, value = item
+            if expires_at <= time.time():
+                return default
+            try:
+                if flags & self.FLAG_COMPRESSED:
+                    value = zlib.decompress(value)
+                return pickle.loads(value)
+            except Exception:
+                return default
+        return default
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        ttl = ttl if ttl is not None else self._ttl
+        expires_at = time.time() + ttl if ttl is not None else float("inf")
+
+        payload, flags = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 0
+        if len(payload) >= self.COMPRESS_FROM:
+            payload, flags = zlib.compress(payload, 1), self.FLAG_COMPRESSED
+
+        key_bytes = key.encode("utf-8")
+        key_hash = self._hash(key_bytes)
+        if self.SLOT_HEADER.size + len(key_bytes) + len(payload) > self._slot_size:
+            # Не помещается в ячейку - прежнее значение не должно остаться в кэше
+            self.delete(key, broadcast=False)
+            return
+
+        slots = self._bucket_slots(key_hash)
+        with self._locked(slots):
+            now = time.time()
+            target, oldest = None, None
+            for slot in slots:
+                _, slot_expires_at, written_at, length, _, _, slot_hash = self.SLOT_HEADER.unpack_from(
+                    self._mm, self._offset(slot)
+                )
+                if slot_hash == key_hash:
+                    target = slot
+                    break
+                if target is None and (length == 0 or slot_expires_at <= now):
+                    target = slot
+                if oldest is None or written_at < oldest[1]:
+                    oldest = (slot, written_at)
+            if target is None:
+                target = oldest[0]
+            self._write(target, key_hash, key_bytes, payload, expires_at, now, flags)
+
+    def delete(self, key: str, broadcast: bool = True) -> None:
+        key_hash = self._hash(key.encode("utf-8"))
+        slots = self._bucket_slots(key_hash)
+        with self._locked(slots):
+            for slot in slots:
+                if self.SLOT_HEADER.unpack_from(self._mm, self._offset(slot))[6] == key_hash:
+                    self._erase(slot)
+        if broadcast and self._publisher:
+            self._publisher("delete", key)
+
+    def delete_prefix(self, prefix: str, broadcast: bool = True) -> None:
+        prefix_bytes = prefix.encode("utf-8")
+        for bucket in range(self._buckets):
+            slots = range(bucket * self.WAYS, (bucket + 1) * self.WAYS)
+            matches = [slot for slot in slots if self._key_startswith(slot, prefix_bytes)]
+            if not matches:
+                continue
+            with self._locked(slots):
+                for slot in matches:
+                    if self._key_startswith(slot, prefix_bytes):
+                        self._erase(slot)
+        if broadcast and self._publisher:
+            self._publisher("delete_prefix", prefix)
+
+    def clear(self, broadcast: bool = True) -> None:
+        with self._locked(range(self._slots)):
+            for slot in range(self._slots):
+                self._erase(slot)
+        if broadcast and self._publisher:
+            self._publisher("clear", "")
+
+    def close(self) -> None:
+        self._mm.close()
+        os.close(self._fd)
+
+    def __len__(self) -> int:
+        now = time.time()
+        count = 0
+        for slot in range(self._slots):
+            _, expires_at, _, length, _, _, _ = self.SLOT_HEADER.unpack_from(self._mm, self._offset(slot))
+            count += length > 0 and expires_at > now
+        return count
+
+    def _remove_unused(self, path: str) -> None:
+        # Сегменты других версий, которые не отображены ни одним воркером
+        for segment in glob.glob(f"{glob.escape(path)}.*"):
+            if segment == self._path:
+                continue
+            try:
+                fd = os.open(segment, os.O_RDWR)
+            except OSError:
+                continue
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                os.unlink(segment)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+
+    def _hash(self, key_bytes: bytes) -> bytes:
+        return hashlib.blake2b(key_bytes, digest_size=16).digest()
+
+    def _bucket_slots(self, key_hash: bytes) -> range:
+        bucket = int.from_bytes(key_hash[:8], "little") % self._buckets
+        return range(bucket * self.WAYS, (bucket + 1) * self.WAYS)
+
+    def _offset(self, slot: int) -> int:
+        return self._data_offset + slot * self._slot_size
+
+    def _locked(self, slots: range) -> "_RangeLock":
+        return _RangeLock(self._fd, self._offset(slots.start), len(slots) * self._slot_size)
+
+    def _read(self, slot: int) -> tuple[float, bytes, int, bytes] | None:
+        offset = self._offset(slot)
+        for _ in range(self.READ_RETRIES):
+            seq = self.SEQ.unpack_from(self._mm, offset)[0]
+            if seq & 1:
+                continue  # запись в процессе
+            _, expires_at, _, length, key_length, flags, _ = self.SLOT_HEADER.unpack_from(self._mm, offset)
+            if length == 0:
+                return None
+            start = offset + self.SLOT_HEADER.size
+            if key_length + length > self._slot_size - self.SLOT_HEADER.size:
+                continue  # заголовок прочитан во время записи
+            data = self._mm[start:start + key_length + length]
+            if self.SEQ.unpack_from(self._mm, offset)[0] == seq:
+                return expires_at, data[:key_length], flags, data[key_length:]
+        return None
+
+    def _key_startswith(self, slot: int, prefix_bytes: bytes) -> bool:
+        offset = self._offset(slot)
+        _, _, _, length, key_length, _, _ = self.SLOT_HEADER.unpack_from(self._mm, offset)
+        if length == 0 or key_length < len(prefix_bytes):
+            return False
+        start = offset + self.SLOT_HEADER.size
+        return self._mm[start:start + len(prefix_bytes)] == prefix_bytes
+
+    def _write(
+            self,
+            slot: int,
+            key_hash: bytes,
+            key_bytes: bytes,
+            payload: bytes,
+            expires_at: float,
+            written_at: float,
+            flags: int
+    ) -> None:
+        offset = self._offset(slot)
+        seq = self.SEQ.unpack_from(self._mm, offset)[0]
+        self.SEQ.pack_into(self._mm, offset, seq | 1)
+
+        start = offset + self.SLOT_HEADER.size
+        self._mm[start:start + len(key_bytes) + len(payload)] = key_bytes + payload
+        self.SLOT_HEADER.pack_into(
+            self._mm, offset,
+            seq | 1, expires_at, written_at, len(payload), len(key_bytes), flags, key_hash
+        )
+        self.SEQ.pack_into(self._mm, offset, (seq | 1) + 1)
+
+    def _erase(self, slot: int) -> None:
+        offset = self._offset(slot)
+        seq = self.SEQ.unpack_from(self._mm, offset)[0]
+        if self.SLOT_HEADER.unpack_from(self._mm, offset)[3] == 0:
+            return
+        self.SEQ.pack_into(self._mm, offset, seq | 1)
+        self.SLOT_HEADER.pack_into(self._mm, offset, seq | 1, 0.0, 0.0, 0, 0, 0, bytes(16))
+        self.SEQ.pack_into(self._mm, offset, (seq | 1) + 1)
+
+
+class _RangeLock:
+    def __init__(self, fd: int, offset: int, length: int):
+        self._fd = fd
+        self._offset = offset
+        self._length = length
+
+    def __enter__(self):
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, self._length, self._offset)
+
+    def __exit__(self, *exc):
+        fcntl.lockf(self._fd, fcntl.LOCK_UN, self._length, self._offset)
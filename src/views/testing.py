@@ -15,7 +15,17 @@ class AttemptTestResponse(BaseView):
 
 
 class AttemptsTestResponse(BaseView):
-    content: list[schemas.AttemptTest]
+    content: list[schemas.AttemptTestSmall]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class TestingScoreStatsResponse(BaseView):
+    content: schemas.TestingScoreStats
+
+
+class AttemptRollupsResponse(BaseView):
+    content: list[schemas.AttemptRollup]
 
 
 class PracticalQuestionResponse(BaseView):
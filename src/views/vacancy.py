@@ -6,8 +6,26 @@ class VacancyResponse(BaseView):
     content: schemas.Vacancy
 
 
+class VacancyBatchResponse(BaseView):
+    content: schemas.VacancyBatch
+
+
 class VacanciesResponse(BaseView):
-    content: list[schemas.VacancySmall]
+    content: list[schemas.VacancyListItem]
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+
+
+class VacancyChangesResponse(BaseView):
+    content: schemas.VacancyChanges
+
+
+class VacancyTitleSuggestionResponse(BaseView):
+    content: str | None
+
+
+class VacancyTitlesResponse(BaseView):
+    content: list[schemas.VacancyTitle]
 
 
 class VacancyFilesResponse(BaseView):
@@ -0,0 +1,57 @@
+import unittest
+import uuid
+
+from src import exceptions
+from src.services.caching import cached
+from src.utils.cache import MemoryCache
+
+
+class Service:
+
+    def __init__(self):
+        self._cache = MemoryCache()
+        self.calls = 0
+
+    @cached("test:item", ttl=30)
+    async def get_item(self, item_id: uuid.UUID, full: bool = False) -> tuple:
+        self.calls += 1
+        return item_id, full
+
+    @cached("test:missing", ttl=30, negative_ttl=30)
+    async def get_missing(self, item_id: uuid.UUID) -> None:
+        self.calls += 1
+        raise exceptions.NotFound("Не найдено")
+
+
+class CachedTestCase(unittest.IsolatedAsyncioTestCase):
+
+    async def test_key_does_not_depend_on_call_form(self):
+        service, item_id = Service(), uuid.uuid4()
+        await service.get_item(item_id)
+        await service.get_item(item_id, False)
+        await service.get_item(item_id=item_id)
+        await service.get_item(item_id, full=False)
+        self.assertEqual(service.calls, 1)
+
+        self.assertEqual(await service.get_item(item_id, full=True), (item_id, True))
+        self.assertEqual(service.calls, 2)
+
+    async def test_cache_key_invalidates_any_call_form(self):
+        service, item_id = Service(), uuid.uuid4()
+        await service.get_item(item_id=item_id)
+        self.assertEqual(service.get_item.cache_key(item_id), f"test:item:{item_id}:False")
+
+        service._cache.delete(service.get_item.cache_key(item_id))
+        await service.get_item(item_id)
+        self.assertEqual(service.calls, 2)
+
+    async def test_not_found_is_cached(self):
+        service, item_id = Service(), uuid.uuid4()
+        for _ in range(2):
+            with self.assertRaises(exceptions.NotFound):
+                await service.get_missing(item_id)
+        self.assertEqual(service.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
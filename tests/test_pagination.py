@@ -0,0 +1,46 @@
+import base64
+import json
+import unittest
+import uuid
+from datetime import datetime, timezone
+
+from src.utils.pagination import Cursor, encode_cursor, decode_cursor, decode_page_cursor
+
+
+def make_token(*items) -> str:
+    raw = json.dumps(list(items)).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+class DecodeCursorTestCase(unittest.TestCase):
+
+    def test_roundtrip(self):
+        cursor = Cursor("created_at", datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc), uuid.uuid4(), "prev")
+        self.assertEqual(decode_cursor(encode_cursor(cursor), ("created_at",)), cursor)
+
+        cursor = Cursor("title", "Вакансия", uuid.uuid4())
+        self.assertEqual(decode_page_cursor(encode_cursor(cursor), "title", ("created_at",)), cursor)
+
+    def test_tampered_cursor(self):
+        vacancy_id = str(uuid.uuid4())
+        tokens = [
+            make_token("title", 123, vacancy_id, "next"),
+            make_token("title", ["a"], vacancy_id, "next"),
+            make_token("title", None, vacancy_id, "next"),
+            make_token("title", "a", 123, "next"),
+            make_token("title", "a", "not-uuid", "next"),
+            make_token("created_at", 123, vacancy_id, "next"),
+            make_token("created_at", "2024-01-01", vacancy_id, "up"),
+            make_token(["title"], "a", vacancy_id, "next"),
+            make_token("title", "a", vacancy_id),
+            make_token({"title": "a"}),
+            "not base64!",
+        ]
+        for token in tokens:
+            with self.subTest(token=token):
+                with self.assertRaisesRegex(ValueError, "Неверный курсор"):
+                    decode_cursor(token, ("created_at",))
+
+
+if __name__ == "__main__":
+    unittest.main()
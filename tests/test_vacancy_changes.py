@@ -0,0 +1,143 @@
+import unittest
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from src.models.auth import AuthenticatedUser, UnauthenticatedUser
+from src.models.permission import Permission
+from src.models.state import VacancyState, VacancyType, UserState
+from src.models import schemas
+from src.services.vacancy import VacancyApplicationService
+from src.utils.cache import MemoryCache
+
+
+class FakeVacancyRepo:
+    """
+    Вакансии и отметки об удалении в памяти с семантикой VacancyRepo
+    """
+
+    def __init__(self):
+        self.vacancies: dict[uuid.UUID, SimpleNamespace] = {}
+        self.tombstones: dict[uuid.UUID, SimpleNamespace] = {}
+        self._now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    def tick(self) -> datetime:
+        self._now += timedelta(seconds=1)
+        return self._now
+
+    def add(self, state: VacancyState) -> uuid.UUID:
+        vacancy = SimpleNamespace(
+            id=uuid.uuid4(),
+            title="Вакансия",
+            poster=None,
+            type=VacancyType.INTERNSHIP,
+            state=state,
+            created_at=self.tick(),
+            updated_at=None,
+        )
+        self.vacancies[vacancy.id] = vacancy
+        return vacancy.id
+
+    async def get(self, id: uuid.UUID):
+        return self.vacancies.get(id)
+
+    async def get_by_ids(self, ids, columns=None):
+        return [self.vacancies[id] for id in ids if id in self.vacancies]
+
+    async def set_hidden(self, id: uuid.UUID, hidden: bool) -> None:
+        if hidden:
+            self.tombstones[id] = SimpleNamespace(state=VacancyState.OPENED, deleted_at=self.tick())
+        else:
+            self.tombstones.pop(id, None)
+
+    async def update(self, id: uuid.UUID, **kwargs) -> None:
+        vars(self.vacancies[id]).update(kwargs, updated_at=self.tick())
+
+    async def delete(self, id: uuid.UUID) -> None:
+        vacancy = self.vacancies.pop(id)
+        previous = self.tombstones.get(id)
+        state = previous.state if previous and previous.state == VacancyState.OPENED else vacancy.state
+        self.tombstones[id] = SimpleNamespace(state=state, deleted_at=self.tick())
+
+    async def get_changes(self, after, until, limit=100, state=None):
+        rows = [
+            SimpleNamespace(id=vacancy.id, changed_at=vacancy.updated_at or vacancy.created_at, deleted=False)
+            for vacancy in self.vacancies.values()
+            if state is None or vacancy.state == state
+        ] + [
+            SimpleNamespace(id=id, changed_at=tombstone.deleted_at, deleted=True)
+            for id, tombstone in self.tombstones.items()
+            if state is None or tombstone.state == state
+        ]
+        rows = [row for row in rows if (row.changed_at, row.id) > after and row.changed_at < until]
+        return sorted(rows, key=lambda row: (row.changed_at, row.id))[:limit]
+
+
+class VacancyChangesTestCase(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        self.repo = FakeVacancyRepo()
+        self.since = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+    def service(self, user) -> VacancyApplicationService:
+        return VacancyApplicationService(
+            current_user=user,
+            vacancy_repo=self.repo,
+            vacancy_summary_repo=None,
+            file_repo=None,
+            file_storage=None,
+            cache=MemoryCache(),
+            db_lazy_session=None,
+        )
+
+    @staticmethod
+    def user(*permissions: Permission) -> AuthenticatedUser:
+        return AuthenticatedUser(
+            id=str(uuid.uuid4()),
+            permissions=[permission.value for permission in permissions],
+            state_id=UserState.ACTIVE.value,
+            exp=0
+        )
+
+    async def test_closed_vacancy_is_deleted_for_public_callers(self):
+        vacancy_id = self.repo.add(VacancyState.OPENED)
+        hidden_id = self.repo.add(VacancyState.CLOSED)
+
+        public = self.service(UnauthenticatedUser())
+        changes = await public.get_changes(since=self.since)
+        self.assertEqual([vacancy.id for vacancy in changes.changed], [vacancy_id])
+        self.assertEqual(changes.deleted, [])
+
+        admin = self.service(self.user(Permission.UPDATE_VACANCY, Permission.GET_PRIVATE_VACANCY))
+        await admin.update_vacancy(vacancy_id, schemas.VacancyUpdate(state=VacancyState.CLOSED))
+
+        changes = await public.get_changes(cursor=changes.next_cursor)
+        self.assertEqual(changes.changed, [])
+        self.assertEqual(changes.deleted, [vacancy_id])
+
+        # С доступом к закрытым вакансиям закрытая вакансия не удалена
+        changes = await admin.get_changes(since=self.since)
+        self.assertEqual({vacancy.id for vacancy in changes.changed}, {vacancy_id, hidden_id})
+        self.assertEqual(changes.deleted, [])
+
+        # Повторное открытие снимает отметку, удаление закрытой вакансии не раскрывает ее id
+        await admin.update_vacancy(vacancy_id, schemas.VacancyUpdate(state=VacancyState.OPENED))
+        await self.repo.delete(hidden_id)
+        changes = await public.get_changes(since=self.since)
+        self.assertEqual([vacancy.id for vacancy in changes.changed], [vacancy_id])
+        self.assertEqual(changes.deleted, [])
+
+    async def test_deleting_closed_vacancy_keeps_it_deleted_for_public_callers(self):
+        vacancy_id = self.repo.add(VacancyState.OPENED)
+        admin = self.service(self.user(Permission.UPDATE_VACANCY, Permission.GET_PRIVATE_VACANCY))
+        await admin.update_vacancy(vacancy_id, schemas.VacancyUpdate(state=VacancyState.CLOSED))
+        await self.repo.delete(vacancy_id)
+
+        changes = await self.service(UnauthenticatedUser()).get_changes(since=self.since)
+        self.assertEqual(changes.deleted, [vacancy_id])
+        changes = await admin.get_changes(since=self.since)
+        self.assertEqual(changes.deleted, [vacancy_id])
+
+
+if __name__ == "__main__":
+    unittest.main()